@@ -2,26 +2,122 @@
 
 from __future__ import annotations
 
+import csv
+import hashlib
+import os
 import re
-import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import cached_property, lru_cache
 from typing import TYPE_CHECKING
 
+from .config import micropython_cache_dir, user_cache_dir
 from .console import (
     StatusLogger,
+    buffered_console,
     print_file_operation,
+    print_file_operations,
     print_header,
     print_info,
     print_keyval,
     print_success,
+    print_table,
     print_warning,
 )
 from .device import check_idf_environment
 from .exceptions import BuildError, CommandError, OperationTimeoutError
-from .subprocess_utils import run_command
+from .fs_utils import fast_copy, fast_rmtree, link_or_copy
+from .subprocess_utils import check_command_available, get_command_output, run_command
+
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping, Sequence
+    from concurrent.futures import Future
+    from pathlib import Path
+
     from .config import BuildConfig, ProjectPaths
 
+    BuildTasks = Mapping[str, tuple[Callable[[], None], Sequence[str]]]
+
+_VERSION_RE = re.compile(rb'version\s*=\s*"([^"]+)"')
+
+BUILD_KEY_FILE = ".build-key"
+TIMINGS_FILE = "build-timings.csv"
+SUBMODULE_FETCH_JOBS = 8
+MICROPYTHON_SPARSE_PATHS = (
+    "drivers",
+    "extmod",
+    "lib",
+    "mpy-cross",
+    "ports/esp32",
+    "py",
+    "shared",
+    "tools",
+)
+
+FIRMWARE_FILES = {
+    "micropython.bin": "firmware.bin",
+    "bootloader/bootloader.bin": "bootloader.bin",
+    "partition_table/partition-table.bin": "partition-table.bin",
+}
+
+
+def _hash_tree(key: hashlib.blake2b, root: Path) -> None:
+    """Feed relative path, size, and mtime of every file under `root` into `key`."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d != "__pycache__")
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            st = os.stat(path)
+            rel_path = os.path.relpath(path, root)
+            key.update(f"{rel_path}:{st.st_size}:{st.st_mtime_ns}\n".encode())
+
+
+@lru_cache(maxsize=1)
+def _read_version(pyproject: Path) -> str:
+    """Return the project version from `pyproject`, or "dev"; parsed once per process."""
+    try:
+        content = pyproject.read_bytes()
+    except FileNotFoundError:
+        return "dev"
+
+    if tomllib is not None:
+        try:
+            return tomllib.loads(content.decode())["project"]["version"]
+        except (KeyError, TypeError, UnicodeDecodeError, tomllib.TOMLDecodeError):
+            return "dev"
+
+    match = _VERSION_RE.search(content)
+    return match.group(1).decode() if match else "dev"
+
+
+def _run_task_graph(tasks: BuildTasks) -> None:
+    """Run each task as soon as all of its dependencies have finished."""
+    pending = dict(tasks)
+    done: set[str] = set()
+    running: dict[Future[None], str] = {}
+
+    with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+        while pending or running:
+            ready = [name for name, (_, deps) in pending.items() if done.issuperset(deps)]
+            for name in ready:
+                func, _ = pending.pop(name)
+                running[executor.submit(func)] = name
+
+            if not running:
+                msg = f"Unresolvable build task dependencies: {', '.join(pending)}"
+                raise BuildError(msg)
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                future.result()
+                done.add(name)
+
 
 class FirmwareBuilder:
     """Builds ESP32 MicroPython firmware with frozen modules."""
@@ -30,10 +126,11 @@ class FirmwareBuilder:
         """Initialize firmware builder."""
         self.config = config
         self.paths = paths
+        self.timings: list[tuple[str, float, float]] = []
 
     def check_prerequisites(self) -> None:
         """Verify ESP-IDF installation and configuration."""
-        with StatusLogger("Checking prerequisites"):
+        with StatusLogger("Checking prerequisites", timings=self.timings):
             idf_path, idf_cmd = check_idf_environment()
             print_keyval("ESP-IDF Path", idf_path)
             print_keyval("idf.py Command", " ".join(idf_cmd))
@@ -45,39 +142,152 @@ class FirmwareBuilder:
             print_info(f"MicroPython submodule already initialized at {self.paths.micropython}")
             return
 
-        with StatusLogger("Initializing MicroPython submodule"):
+        with StatusLogger("Initializing MicroPython submodule", timings=self.timings):
+            pin = self._micropython_pin()
+            cache = self._seed_micropython_cache(*pin) if pin else None
             try:
-                run_command(
-                    [
-                        "git",
-                        "submodule",
-                        "update",
-                        "--init",
-                        "--recursive",
-                        "micropython",
-                    ],
-                    cwd=self.paths.root,
-                    verbose=self.config.verbose,
-                )
+                if pin is None or not self._sparse_checkout_micropython(*pin, cache):
+                    self._update_micropython_submodule(cache)
             except (CommandError, OperationTimeoutError, OSError) as e:
                 msg = f"Failed to initialize MicroPython submodule: {e}"
                 raise BuildError(msg) from e
 
+    def _micropython_pin(self) -> tuple[str, str] | None:
+        """Return the MicroPython submodule `(url, commit)`, or None if unreadable."""
+        root = self.paths.root
+        url = get_command_output(
+            ["git", "config", "-f", ".gitmodules", "submodule.micropython.url"],
+            cwd=root,
+        )
+        tree = get_command_output(["git", "ls-tree", "HEAD", "micropython"], cwd=root)
+        if not url or not tree:
+            return None
+        return url, tree.split()[2]
+
+    def _seed_micropython_cache(self, url: str, commit: str) -> Path | None:
+        """Make the pinned MicroPython commit available in the shared cache.
+
+        The cache is a bare repository whose `pinned` branch points at the
+        submodule commit. Returns None if the fetch fails, in which case the
+        submodule is fetched from upstream directly.
+        """
+        cache = micropython_cache_dir() / hashlib.sha256(url.encode()).hexdigest()[:16]
+        git_cache = ["git", "-C", str(cache)]
+        try:
+            if not (cache / "HEAD").exists():
+                cache.mkdir(parents=True, exist_ok=True)
+                run_command(["git", "init", "--bare", "--quiet", str(cache)])
+                run_command([*git_cache, "config", "uploadpack.allowAnySHA1InWant", "true"])
+                run_command([*git_cache, "config", "uploadpack.allowFilter", "true"])
+
+            if get_command_output([*git_cache, "cat-file", "-e", f"{commit}^{{commit}}"]) is None:
+                run_command(
+                    [*git_cache, "fetch", "--depth", "1", url, commit],
+                    verbose=self.config.verbose,
+                    timeout=None,
+                )
+            else:
+                print_info(f"Using cached MicroPython objects from {cache}")
+
+            run_command([*git_cache, "update-ref", "refs/heads/pinned", commit])
+            run_command([*git_cache, "symbolic-ref", "HEAD", "refs/heads/pinned"])
+        except (CommandError, OperationTimeoutError, OSError) as e:
+            print_warning(f"Could not populate MicroPython cache, cloning directly: {e}")
+            return None
+        return cache
+
+    def _sparse_checkout_micropython(self, url: str, commit: str, cache: Path | None) -> bool:
+        """Check out only `MICROPYTHON_SPARSE_PATHS` at the pin, fetching blobs lazily.
+
+        Returns False, after removing the partial checkout, when git or the
+        remote does not support sparse partial clones.
+        """
+        root = self.paths.root
+        worktree = self.paths.micropython
+        git_path = get_command_output(
+            ["git", "rev-parse", "--git-path", "modules/micropython"],
+            cwd=root,
+        )
+        if not git_path:
+            return False
+
+        gitdir = root / git_path
+        git = ["git", "-C", str(worktree)]
+        if cache is not None:
+            git += ["-c", "protocol.file.allow=always"]
+        try:
+            run_command(["git", "init", "--quiet", f"--separate-git-dir={gitdir}", str(worktree)])
+            (worktree / ".git").write_text(f"gitdir: {os.path.relpath(gitdir, worktree)}\n")
+            run_command([*git, "config", "core.worktree", os.path.relpath(worktree, gitdir)])
+            run_command([*git, "remote", "add", "origin", cache.as_uri() if cache else url])
+            run_command([*git, "config", "remote.origin.promisor", "true"])
+            run_command([*git, "config", "remote.origin.partialclonefilter", "blob:none"])
+            run_command([*git, "sparse-checkout", "set", "--cone", *MICROPYTHON_SPARSE_PATHS])
+            for step in (
+                ["fetch", "--quiet", "--depth", "1", "--filter=blob:none", "origin", commit],
+                ["checkout", "--quiet", "--detach", commit],
+            ):
+                run_command([*git, *step], verbose=self.config.verbose, timeout=None)
+            run_command([*git, "remote", "set-url", "origin", url])
+            run_command(["git", "submodule", "--quiet", "init", "micropython"], cwd=root)
+        except (CommandError, OperationTimeoutError, OSError) as e:
+            print_warning(f"Sparse checkout failed, falling back to a full checkout: {e}")
+            fast_rmtree(gitdir, worktree)
+            worktree.mkdir(exist_ok=True)
+            return False
+        return True
+
+    def _update_micropython_submodule(self, cache: Path | None) -> None:
+        """Check out the full MicroPython submodule, cloning from `cache` when available."""
+        root = self.paths.root
+        update = ["git", "submodule", "update", "--depth", "1", "--single-branch"]
+        if cache is None:
+            run_command(
+                [*update, "--init", "--jobs", str(SUBMODULE_FETCH_JOBS), "micropython"],
+                cwd=root,
+                verbose=self.config.verbose,
+            )
+            return
+
+        # Clone from the local cache, then point the submodule back upstream.
+        run_command(["git", "submodule", "init", "micropython"], cwd=root)
+        run_command(
+            [
+                "git",
+                "-c",
+                f"submodule.micropython.url={cache.as_uri()}",
+                "-c",
+                "protocol.file.allow=always",
+                *update[1:],
+                "micropython",
+            ],
+            cwd=root,
+            verbose=self.config.verbose,
+        )
+        run_command(["git", "submodule", "sync", "--quiet", "micropython"], cwd=root)
+
     def build_mpy_cross(self) -> None:
         """Build mpy-cross compiler if missing."""
         mpy_cross_bin = self.paths.mpy_cross / "build" / "mpy-cross"
 
-        if mpy_cross_bin.exists():
-            print_info("mpy-cross already built")
-            return
+        try:
+            st = mpy_cross_bin.stat()
+        except FileNotFoundError:
+            pass
+        else:
+            if st.st_size > 0 and st.st_mode & 0o111:
+                print_info("mpy-cross already built")
+                return
 
-        with StatusLogger("Building mpy-cross compiler"):
+        with StatusLogger("Building mpy-cross compiler", timings=self.timings):
             try:
                 run_command(
-                    ["make", "CC=gcc"],
+                    ["make", f"-j{self.side_jobs}", "CC=ccache gcc" if self.ccache else "CC=gcc"],
                     cwd=self.paths.mpy_cross,
+                    env=self._make_env(self.side_jobs),
                     verbose=self.config.verbose,
                     timeout=None,
+                    quiet=not self.config.verbose,
                 )
             except (CommandError, OperationTimeoutError, OSError) as e:
                 msg = f"Failed to build mpy-cross: {e}"
@@ -85,47 +295,138 @@ class FirmwareBuilder:
 
     def clean_build_artifacts(self) -> None:
         """Remove existing build and dist directories."""
-        build_dir = self.paths.build_dir(self.config.board)
-
-        if build_dir.exists():
-            print_info(f"Cleaning build directory: {build_dir}")
-            shutil.rmtree(build_dir)
-            print_file_operation("Removed", str(build_dir))
-
-        if self.paths.dist.exists():
-            print_info(f"Cleaning dist directory: {self.paths.dist}")
-            shutil.rmtree(self.paths.dist)
-            print_file_operation("Removed", str(self.paths.dist))
-
-    def build_firmware(self) -> None:
-        """Build MicroPython firmware with frozen modules."""
-        with StatusLogger(f"Building firmware for {self.config.board}"):
-            if self.config.clean:
-                self.clean_build_artifacts()
-
-            make_args = [f"BOARD={self.config.board}"]
+        targets = [path for path in (self.build_dir, self.paths.dist) if path.is_dir()]
+        if not targets:
+            return
 
-            board_dir = self.paths.board_dir(self.config.board)
-            if board_dir.exists():
-                print_info(f"Using custom board definition from: {board_dir}")
-                make_args.append(f"BOARD_DIR={board_dir}")
+        fast_rmtree(*targets)
+        print_file_operations("Removed", map(str, targets))
+
+    @cached_property
+    def build_dir(self) -> Path:
+        """ESP32 port build directory for the configured board."""
+        return self.paths.build_dir(self.config.board)
+
+    @cached_property
+    def board_dir(self) -> Path:
+        """Custom board definition directory for the configured board."""
+        return self.paths.board_dir(self.config.board)
+
+    @cached_property
+    def jobs(self) -> int:
+        """Parallel job count for `make`; defaults to the CPU count."""
+        return self.config.jobs or os.cpu_count() or 1
+
+    @cached_property
+    def ccache(self) -> bool:
+        """Whether `ccache` is available to wrap C compilations."""
+        return check_command_available("ccache")
+
+    @cached_property
+    def side_jobs(self) -> int:
+        """Job count for mpy-cross and port submodules, which run side by side unless verbose."""
+        return self.jobs if self.config.verbose else max(1, self.jobs // 2)
+
+    def _make_env(self, jobs: int) -> dict[str, str]:
+        """Environment for `make`: job count for recursive makes, plus ccache when present."""
+        env = {**os.environ, "MAKEFLAGS": f"-j{jobs}"}
+        if self.ccache:
+            env["IDF_CCACHE_ENABLE"] = "1"
+            env["CCACHE_BASEDIR"] = str(self.paths.root)
+            env.setdefault("CCACHE_DIR", str(user_cache_dir() / "ccache"))
+        return env
+
+    @cached_property
+    def make_env(self) -> dict[str, str]:
+        """Environment for the firmware `make`, using the full job count."""
+        return self._make_env(self.jobs)
+
+    @cached_property
+    def board_args(self) -> list[str]:
+        """Board arguments shared by every ESP32 port `make` invocation."""
+        board_args = [f"BOARD={self.config.board}"]
+        if self.board_dir.exists():
+            board_args.append(f"BOARD_DIR={self.board_dir}")
+        return board_args
+
+    def update_port_submodules(self) -> None:
+        """Fetch the MicroPython submodules required by the ESP32 port."""
+        if self.firmware_state[1]:
+            print_info("Firmware is up to date, skipping ESP32 port submodules")
+            return
 
+        with StatusLogger("Updating ESP32 port submodules", timings=self.timings):
             try:
                 run_command(
-                    ["make", *make_args, "submodules"],
+                    ["make", f"-j{self.side_jobs}", *self.board_args, "submodules"],
                     cwd=self.paths.micropython_esp32,
+                    env=self._make_env(self.side_jobs),
                     verbose=self.config.verbose,
                     timeout=None,
+                    quiet=not self.config.verbose,
                 )
+            except (CommandError, OperationTimeoutError, OSError) as e:
+                msg = f"Failed to update ESP32 port submodules: {e}"
+                raise BuildError(msg) from e
+
+    def build_key(self) -> str:
+        """Digest of the inputs that determine the firmware image."""
+        key = hashlib.blake2b(digest_size=16)
+        key.update(f"{self.config.board}:{self.version}\n".encode())
+
+        head = get_command_output(["git", "rev-parse", "HEAD"], cwd=self.paths.micropython)
+        key.update(f"{head or 'unknown'}\n".encode())
+
+        _hash_tree(key, self.board_dir)
+        _hash_tree(key, self.paths.modules)
+        st = (self.paths.root / "pyproject.toml").stat()
+        key.update(f"pyproject.toml:{st.st_size}:{st.st_mtime_ns}\n".encode())
+        return key.hexdigest()
+
+    @cached_property
+    def firmware_state(self) -> tuple[str, bool]:
+        """`(build key, whether dist/ already holds it)`, computed once after setup and clean."""
+        build_key = self.build_key()
+        return build_key, self._is_up_to_date(build_key)
+
+    def _is_up_to_date(self, build_key: str) -> bool:
+        """Return whether `dist/` already holds artifacts for `build_key`."""
+        dist = self.paths.dist
+        try:
+            stored_key = (dist / BUILD_KEY_FILE).read_text().strip()
+        except FileNotFoundError:
+            return False
+
+        if stored_key != build_key:
+            return False
+        with os.scandir(dist) as entries:
+            present = {entry.name for entry in entries}
+        return present.issuperset([*FIRMWARE_FILES.values(), self.versioned_firmware_name])
+
+    def build_firmware(self) -> None:
+        """Build MicroPython firmware with frozen modules."""
+        build_key, up_to_date = self.firmware_state
+        if up_to_date:
+            print_info(f"Firmware for {self.config.board} is up to date, skipping make")
+            return
 
+        with StatusLogger(f"Building firmware for {self.config.board}", timings=self.timings):
+            if self.board_dir.exists():
+                print_info(f"Using custom board definition from: {self.board_dir}")
+
+            try:
                 run_command(
-                    ["make", *make_args],
+                    ["make", f"-j{self.jobs}", *self.board_args],
                     cwd=self.paths.micropython_esp32,
+                    env=self.make_env,
                     verbose=self.config.verbose,
                     timeout=None,
                 )
+                if self.ccache and self.config.verbose:
+                    run_command(["ccache", "-s"], env=self.make_env, check=False, verbose=True)
 
                 self._copy_firmware_artifacts()
+                (self.paths.dist / BUILD_KEY_FILE).write_text(f"{build_key}\n")
 
             except (CommandError, OperationTimeoutError, OSError) as e:
                 msg = f"Failed to build firmware: {e}"
@@ -133,49 +434,99 @@ class FirmwareBuilder:
 
     def _copy_firmware_artifacts(self) -> None:
         """Copy bootloader, partition table, and firmware to dist/."""
-        self.paths.dist.mkdir(parents=True, exist_ok=True)
+        dist = self.paths.dist
+        dist.mkdir(parents=True, exist_ok=True)
 
-        build_dir = self.paths.build_dir(self.config.board)
+        build_dir = self.build_dir
+        versioned_name = self.versioned_firmware_name
 
-        firmware_files = {
-            "micropython.bin": "firmware.bin",
-            "bootloader/bootloader.bin": "bootloader.bin",
-            "partition_table/partition-table.bin": "partition-table.bin",
-        }
+        def copy_artifact(src_rel: str, dest_name: str) -> None:
+            fast_copy(build_dir / src_rel, dist / dest_name)
+            if dest_name == "firmware.bin":
+                link_or_copy(dist / dest_name, dist / versioned_name)
 
-        for src_rel, dest_name in firmware_files.items():
-            src = build_dir / src_rel
-            if src.exists():
-                dest = self.paths.dist / dest_name
-                shutil.copy2(src, dest)
-                print_file_operation("Copied", dest_name)
-            else:
+        with ThreadPoolExecutor(max_workers=len(FIRMWARE_FILES)) as pool:
+            copies = {
+                src_rel: pool.submit(copy_artifact, src_rel, dest_name)
+                for src_rel, dest_name in FIRMWARE_FILES.items()
+            }
+
+        for src_rel, dest_name in FIRMWARE_FILES.items():
+            copy = copies[src_rel]
+            try:
+                copy.result()
+            except FileNotFoundError:
                 print_warning(f"Firmware file not found: {src_rel}")
+                continue
+            print_file_operation("Copied", dest_name)
+            if dest_name == "firmware.bin":
+                print_file_operation("Created", versioned_name)
 
-        micropython_bin = build_dir / "micropython.bin"
-        if micropython_bin.exists():
-            version = self._get_version()
-            versioned_name = f"stripalerts-{version}-{self.config.board}.bin"
-            shutil.copy2(micropython_bin, self.paths.dist / versioned_name)
-            print_file_operation("Created", versioned_name)
-
-    def _get_version(self) -> str:
-        """Extract version from `pyproject.toml`."""
-        pyproject_path = self.paths.root / "pyproject.toml"
-        if pyproject_path.exists():
-            content = pyproject_path.read_text()
-            match = re.search(r'version\s*=\s*"([^"]+)"', content)
-            if match:
-                return match.group(1)
-        return "dev"
+    @property
+    def version(self) -> str:
+        """Project version from `pyproject.toml`."""
+        return _read_version(self.paths.root / "pyproject.toml")
+
+    @property
+    def versioned_firmware_name(self) -> str:
+        """File name of the versioned firmware image in `dist/`."""
+        return f"stripalerts-{self.version}-{self.config.board}.bin"
 
     def build(self) -> None:
         """Execute complete build workflow."""
         print_header("StripAlerts ESP32 Firmware Builder", f"Board: {self.config.board}")
 
-        self.check_prerequisites()
-        self.setup_micropython()
-        self.build_mpy_cross()
-        self.build_firmware()
+        setup_deps = ["prerequisites", "micropython"]
+        if self.config.clean:
+            setup_deps.append("clean")
+        tasks: dict[str, tuple[Callable[[], None], Sequence[str]]] = {
+            "prerequisites": (self.check_prerequisites, []),
+            "micropython": (self.setup_micropython, []),
+            "mpy_cross": (self.build_mpy_cross, ["micropython"]),
+            # Verbose output of two makes would interleave, so run them one after the other.
+            "submodules": (
+                self.update_port_submodules,
+                [*setup_deps, "mpy_cross"] if self.config.verbose else setup_deps,
+            ),
+            "firmware": (self.build_firmware, ["mpy_cross", "submodules"]),
+        }
+        if self.config.clean:
+            tasks["clean"] = (self.clean_build_artifacts, [])
+
+        started = time.perf_counter()
+        _run_task_graph(tasks)
+        self._report_timings(started, time.perf_counter())
 
         print_success(f"Build completed - artifacts in {self.paths.dist}")
+
+    def _report_timings(self, started: float, finished: float) -> None:
+        """Print step timings and write them to `dist/build-timings.csv`."""
+        if not self.timings:
+            return
+
+        rows = sorted(
+            ((name, start - started, end - start) for name, start, end in self.timings),
+            key=lambda row: row[2],
+            reverse=True,
+        )
+        wall = finished - started
+        busy = sum(duration for _, _, duration in rows)
+
+        with buffered_console():
+            print_table(
+                "Build step timings",
+                ["Step", "Start (s)", "Duration (s)"],
+                [(name, f"{offset:.2f}", f"{duration:.2f}") for name, offset, duration in rows],
+            )
+            print_keyval("Wall time", f"{wall:.2f}s")
+            if wall > 0:
+                print_keyval("Parallelism", f"{busy / wall:.2f}x")
+
+        dist = self.paths.dist
+        dist.mkdir(parents=True, exist_ok=True)
+        with (dist / TIMINGS_FILE).open("w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["step", "start_s", "duration_s"])
+            writer.writerows(
+                (name, f"{offset:.3f}", f"{duration:.3f}") for name, offset, duration in rows
+            )
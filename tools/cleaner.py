@@ -2,11 +2,18 @@
 
 from __future__ import annotations
 
+import contextlib
+import os
 import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
 from typing import TYPE_CHECKING
 
+from .config import micropython_cache_dir
 from .console import (
     StatusLogger,
+    buffered_console,
     print_file_operation,
     print_header,
     print_info,
@@ -14,103 +21,190 @@ from .console import (
     print_warning,
 )
 from .exceptions import CommandError
-from .subprocess_utils import check_command_available, run_command
+from .fs_utils import fast_rmtree
+from .subprocess_utils import run_command
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+
     from .config import ProjectPaths
 
+MAX_RMTREE_WORKERS = 8
+CACHE_SUFFIXES = (".pyc", ".pyo", ".pyd")
+CACHE_DIRS = frozenset({"__pycache__"})
+
+
+def _iter_cache_entries(root: str, skip: str) -> Iterator[tuple[str, bool]]:
+    """Yield `(path, is_dir)` for Python cache entries under `root`, pruning `skip`."""
+    scandir, cache_dirs, cache_suffixes = os.scandir, CACHE_DIRS, CACHE_SUFFIXES
+    stack = [root]
+    pop, push = stack.pop, stack.append
+    while stack:
+        try:
+            entries = scandir(pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name in cache_dirs:
+                        yield entry.path, True
+                    elif entry.path != skip:
+                        push(entry.path)
+                elif entry.name.endswith(cache_suffixes):
+                    yield entry.path, False
+
+
+def _remove_pycache(path: str) -> None:
+    """Remove a flat `__pycache__` directory, falling back to `shutil.rmtree`."""
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                os.unlink(entry.path)
+        os.rmdir(path)
+    except OSError:
+        shutil.rmtree(path)
+
 
 class BuildCleaner:
     """Cleans build artifacts and caches."""
 
-    def __init__(self, paths: ProjectPaths, *, deep_clean: bool = False) -> None:
+    def __init__(
+        self,
+        paths: ProjectPaths,
+        *,
+        deep_clean: bool = False,
+        purge_cache: bool = False,
+    ) -> None:
         """Initialize build cleaner."""
         self.paths = paths
         self.deep_clean = deep_clean
+        self.purge_cache = purge_cache
 
     def clean_build_artifacts(self) -> None:
         """Remove dist/ and build-* directories."""
         with StatusLogger("Cleaning build artifacts"):
-            if self.paths.dist.exists():
-                print_info(f"Removing: {self.paths.dist}")
-                try:
-                    shutil.rmtree(self.paths.dist)
-                    print_file_operation("Removed", str(self.paths.dist))
-                except OSError as e:
-                    print_warning(f"Failed to remove {self.paths.dist}: {e}")
-
-            if self.paths.micropython_esp32.exists():
-                dirs_to_clean = list(self.paths.micropython_esp32.glob("build-*"))
-                build_dir = self.paths.micropython_esp32 / "build"
-                if build_dir.exists():
-                    dirs_to_clean.append(build_dir)
-
+            dirs_to_clean: list[Path] = []
+            if self.paths.dist.is_dir():
+                dirs_to_clean.append(self.paths.dist)
+
+            port_dir = self.paths.micropython_esp32
+            with contextlib.suppress(FileNotFoundError), os.scandir(port_dir) as entries:
+                dirs_to_clean.extend(
+                    Path(entry.path)
+                    for entry in entries
+                    if (entry.name == "build" or entry.name.startswith("build-"))
+                    and entry.is_dir(follow_symlinks=False)
+                )
+
+            if not dirs_to_clean:
+                return
+
+            with buffered_console():
                 for build_dir in dirs_to_clean:
-                    if build_dir.is_dir():
-                        print_info(f"Removing: {build_dir.name}")
-                        try:
-                            shutil.rmtree(build_dir)
-                            print_file_operation("Removed", build_dir.name)
-                        except OSError as e:
-                            print_warning(f"Failed to remove {build_dir.name}: {e}")
+                    print_info(f"Removing: {build_dir.name}")
+
+            max_workers = min(MAX_RMTREE_WORKERS, len(dirs_to_clean))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {executor.submit(fast_rmtree, d): d for d in dirs_to_clean}
+                for future in as_completed(futures):
+                    build_dir = futures[future]
+                    try:
+                        future.result()
+                        print_file_operation("Removed", build_dir.name)
+                    except OSError as e:
+                        print_warning(f"Failed to remove {build_dir.name}: {e}")
 
     def clean_python_cache(self) -> None:
         """Remove __pycache__ and *.pyc files."""
         with StatusLogger("Cleaning Python cache files"):
-            patterns = ["**/__pycache__", "**/*.pyc", "**/*.pyo", "**/*.pyd"]
-            micropython_root = self.paths.micropython.resolve()
-
-            for pattern in patterns:
-                for path in self.paths.root.glob(pattern):
-                    resolved = path.resolve()
-                    if micropython_root in resolved.parents or resolved == micropython_root:
-                        continue
-
-                    try:
-                        if path.is_dir():
-                            shutil.rmtree(path)
-                        else:
-                            path.unlink()
-                        rel_path = path.relative_to(self.paths.root)
-                        print_file_operation("Removed", str(rel_path))
-                    except OSError as e:
-                        print_warning(f"Failed to remove {path}: {e}")
+            root = os.fspath(self.paths.root)
+            skip = os.fspath(self.paths.micropython)
+            entries = list(_iter_cache_entries(root, skip))
+            if not entries:
+                return
+
+            with ThreadPoolExecutor(max_workers=MAX_RMTREE_WORKERS) as executor:
+                errors = list(executor.map(self._remove_cache_entry, entries))
+
+            # Report from this thread so the lines stay in the stage's buffered block.
+            for (path, _), error in zip(entries, errors):
+                if error is not None:
+                    print_warning(f"Failed to remove {path}: {error}")
+            dirs = sum(error is None for (_, is_dir), error in zip(entries, errors) if is_dir)
+            files = sum(error is None for error in errors) - dirs
+            print_info(f"Removed {files} cache files, {dirs} directories")
+
+    def _remove_cache_entry(self, entry: tuple[str, bool]) -> OSError | None:
+        """Remove one `(path, is_dir)` cache entry; return the error on failure."""
+        path, is_dir = entry
+        try:
+            if is_dir:
+                _remove_pycache(path)
+            else:
+                os.unlink(path)
+        except OSError as e:
+            return e
+        return None
 
     def clean_micropython(self) -> None:
-        """Run `make clean` in MicroPython build directories."""
+        """Run `make clean` in mpy-cross; ESP32 port builds are removed with build artifacts."""
         if not self.paths.micropython.exists():
             print_info("MicroPython directory not found, skipping")
             return
 
         with StatusLogger("Cleaning MicroPython artifacts"):
-            if (self.paths.mpy_cross / "Makefile").exists():
-                try:
-                    print_info("Cleaning mpy-cross...")
-                    run_command(["make", "clean"], cwd=self.paths.mpy_cross)
-                    print_file_operation("Cleaned", "mpy-cross")
-                except (CommandError, OSError) as e:
-                    print_warning(f"Failed to clean mpy-cross: {e}")
-
-            if (self.paths.micropython_esp32 / "Makefile").exists():
-                if not check_command_available("idf.py"):
-                    print_info("idf.py not found, skipping ESP32 port clean")
-                else:
-                    try:
-                        print_info("Cleaning ESP32 port...")
-                        run_command(["make", "clean"], cwd=self.paths.micropython_esp32)
-                        print_file_operation("Cleaned", "esp32 port")
-                    except (CommandError, OSError) as e:
-                        print_warning(f"Failed to clean ESP32 port: {e}")
+            if not (self.paths.mpy_cross / "Makefile").exists():
+                return
+
+            try:
+                print_info("Cleaning mpy-cross...")
+                run_command(["make", "clean"], cwd=self.paths.mpy_cross, quiet=True)
+                print_file_operation("Cleaned", "mpy-cross")
+            except (CommandError, OSError) as e:
+                print_warning(f"Failed to clean mpy-cross: {e}")
+
+    def purge_download_cache(self) -> None:
+        """Remove the shared MicroPython download cache."""
+        cache = micropython_cache_dir()
+        if not cache.is_dir():
+            return
+
+        with StatusLogger("Purging MicroPython download cache"):
+            try:
+                fast_rmtree(cache)
+                print_file_operation("Removed", str(cache))
+            except OSError as e:
+                print_warning(f"Failed to remove {cache}: {e}")
 
     def clean(self) -> None:
         """Execute full cleaning workflow."""
         print_header("StripAlerts ESP32 Build Cleaner")
 
-        self.clean_build_artifacts()
-        self.clean_python_cache()
-
+        stages = [self.clean_build_artifacts, self.clean_python_cache]
         if self.deep_clean:
             print_info("Performing deep clean (including MicroPython)...")
-            self.clean_micropython()
+            stages.append(self.clean_micropython)
+        if self.purge_cache:
+            stages.append(self.purge_download_cache)
+
+        # Stages run concurrently, but each one's output is held and written as
+        # one block, in stage order, once the stage and those before it finish.
+        printed = [threading.Event() for _ in stages]
+
+        def run_stage(index: int) -> None:
+            try:
+                with buffered_console():
+                    try:
+                        stages[index]()
+                    finally:
+                        if index:
+                            printed[index - 1].wait()
+            finally:
+                printed[index].set()
+
+        with ThreadPoolExecutor(max_workers=len(stages)) as executor:
+            for future in [executor.submit(run_stage, i) for i in range(len(stages))]:
+                future.result()
 
         print_success("Clean completed")
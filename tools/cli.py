@@ -3,33 +3,26 @@
 
 from __future__ import annotations
 
-import functools
+import sys
 import time
-from typing import TYPE_CHECKING, Annotated, ParamSpec, TypeVar
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Annotated
 
+import click
 import typer
-from rich.traceback import install as install_rich_traceback
-
-from .builder import FirmwareBuilder
-from .cleaner import BuildCleaner
-from .config import (
-    BuildConfig,
-    FlashConfig,
-    FlashingConfig,
-    MonitorConfig,
-    ProjectPaths,
-    RetryConfig,
-    UploadConfig,
-)
-from .console import print_error, print_header, print_info, print_success
+
+from .config import FlashConfig, RetryConfig
+from .console import print_error, print_header, print_info, print_success, print_warning
 from .exceptions import StripAlertsError
-from .monitor import SerialMonitor
-from .uploader import FileUploader, FirmwareUploader
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Sequence
+    from concurrent.futures import Future
+
+    from .config import FlashingConfig, ProjectPaths
+    from .uploader import FileUploader
 
-install_rich_traceback(show_locals=True)
 
 app = typer.Typer(
     name="stripalerts",
@@ -39,79 +32,223 @@ app = typer.Typer(
     rich_markup_mode="rich",
 )
 
-P = ParamSpec("P")
-R = TypeVar("R")
+
+BoardOption = Annotated[
+    str,
+    typer.Option("--board", "-b", help="ESP32 board variant"),
+]
+PortOption = Annotated[
+    str | None,
+    typer.Option("--port", "-p", help="Serial port (auto-detect if not set)"),
+]
+FlashBaudOption = Annotated[
+    int,
+    typer.Option("--baud", help="Baud rate for flashing"),
+]
+CleanOption = Annotated[
+    bool,
+    typer.Option("--clean", "-c", help="Clean before building"),
+]
+VerboseOption = Annotated[
+    bool,
+    typer.Option("--verbose", "-v", help="Show verbose output"),
+]
+JobsOption = Annotated[
+    int | None,
+    typer.Option("--jobs", "-j", min=1, help="Parallel make jobs (default: CPU count)"),
+]
+EraseOption = Annotated[
+    bool,
+    typer.Option("--erase", "-e", help="Erase flash before flashing"),
+]
+
+
+@app.callback()
+def _global_options(
+    refresh_checks: Annotated[
+        bool,
+        typer.Option("--refresh-checks", help="Re-detect tools instead of using cached checks"),
+    ] = False,
+    deep_probe: Annotated[
+        bool,
+        typer.Option(
+            "--deep-probe",
+            help="If no port is found, query the chip with esptool (slow, resets the board)",
+        ),
+    ] = False,
+) -> None:
+    """StripAlerts ESP32 Firmware Development CLI."""
+    if refresh_checks:
+        from .device import clear_check_caches
+
+        clear_check_caches()
+    if deep_probe:
+        from .device import enable_deep_probe
+
+        enable_deep_probe()
+
+
+def _run_per_port(ports: Sequence[str], action: Callable[[str], object], what: str) -> None:
+    """Run `action` for every port concurrently, reporting each failure."""
+    with ThreadPoolExecutor(max_workers=len(ports)) as pool:
+        futures = {pool.submit(action, port): port for port in ports}
+    failed = {futures[f]: error for f in futures if (error := f.exception()) is not None}
+    for port, error in failed.items():
+        print_error(f"{port}: {error}")
+    if failed:
+        msg = f"{what} failed on {', '.join(failed)}"
+        raise StripAlertsError(msg)
 
 
 def _paths() -> ProjectPaths:
     """Return workspace paths for CLI commands."""
-    return ProjectPaths.from_tools_dir()
-
+    from .config import ProjectPaths
 
-def handle_errors(func: Callable[P, R]) -> Callable[P, R]:
-    """Decorator to handle common CLI errors with consistent messaging."""
+    return ProjectPaths.from_tools_dir()
 
-    @functools.wraps(func)
-    def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
-        try:
-            return func(*args, **kwargs)
-        except StripAlertsError as e:
-            print_error(str(e))
-            raise typer.Exit(1) from e
-        except KeyboardInterrupt:
-            print_info(f"{func.__name__.capitalize()} stopped by user")
-            raise typer.Exit(130) from None
-        except Exception as e:
-            print_error(f"Unexpected error: {e}")
-            raise typer.Exit(1) from e
 
-    return wrapper
+@dataclass
+class _DeployPlan:
+    """The steps of one `deploy` run and the state they share."""
+
+    paths: ProjectPaths
+    flash_config: FlashingConfig
+    ports: list[str]
+    stabilize_seconds: float
+    build: Callable[[], object] | None
+    flash: bool
+    upload: bool
+    monitor: bool
+    file_uploader: FileUploader = field(init=False)
+    port: str | None = field(init=False)
+    port_lookup: Future[str] | None = field(init=False, default=None)
+    upload_prep: Future[object] | None = field(init=False, default=None)
+    flashed_at: float | None = field(init=False, default=None)
+
+    def __post_init__(self) -> None:
+        """Set up the shared file uploader and the port, if one was given."""
+        from .config import UploadConfig
+        from .uploader import FileUploader
+
+        self.file_uploader = FileUploader(UploadConfig(), self.paths)
+        self.port = self.ports[0] if self.ports else None
+
+    def steps(self) -> list[tuple[str, Callable[[], object]]]:
+        """Return the enabled steps as (label, action) pairs, in order."""
+        steps: list[tuple[str, Callable[[], object]]] = []
+        if self.build is not None:
+            steps.append(("Building Firmware", self.build))
+        if len(self.ports) > 1:
+            if self.flash or self.upload:
+                steps.append((f"Deploying to {len(self.ports)} Devices", self._deploy_all))
+            return steps
+        device_steps = [
+            ("Flashing Firmware", self.flash, self._flash_step),
+            ("Uploading Application Files", self.upload, self._upload_step),
+            ("Monitoring Device", self.monitor, self._monitor_step),
+        ]
+        steps += [(label, action) for label, on, action in device_steps if on]
+        return steps
+
+    def run(self) -> None:
+        """Run the enabled steps, preparing uploads and the device during the build."""
+        from .device import prefetch_port
+
+        steps = self.steps()
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            if self.upload:
+                self.upload_prep = executor.submit(self.file_uploader.prepare)
+            # Overlap device discovery and the esptool import with the build.
+            if self.build is not None and len(steps) > 1:
+                self.port_lookup = prefetch_port(executor, self.port, preload_esptool=self.flash)
+
+            for counter, (label, action) in enumerate(steps, start=1):
+                print_header(f"STEP {counter}/{len(steps)}: {label}")
+                action()
+
+    def _device_port(self) -> str:
+        """Return the single target port, detecting it on first use."""
+        from .device import resolve_port
+
+        self.port = resolve_port(self.port, self.port_lookup)
+        return self.port
+
+    def _flash(self, target: str) -> float:
+        """Flash `target` and return when it finished."""
+        from .uploader import FirmwareUploader
+
+        FirmwareUploader(replace(self.flash_config, port=target), self.paths).upload()
+        return time.monotonic()
+
+    def _upload(self, target: str, flashed: float | None) -> None:
+        """Upload files to `target`, first waiting for it to return if it was flashed."""
+        from .device import wait_for_device
+
+        if self.upload_prep is not None:
+            self.upload_prep.result()
+        if flashed is not None:
+            remaining = self.stabilize_seconds - (time.monotonic() - flashed)
+            print_info(f"Waiting up to {max(remaining, 0):.1f}s for {target} to come back...")
+            if wait_for_device(target, remaining):
+                print_success(f"Device on {target} ready")
+            else:
+                print_warning(f"{target} not detected after flashing, trying upload anyway")
+        self.file_uploader.upload_files(target)
+
+    def _flash_step(self) -> None:
+        """Flash the single target device."""
+        self.flashed_at = self._flash(self._device_port())
+
+    def _upload_step(self) -> None:
+        """Upload files to the single target device."""
+        self._upload(self._device_port(), self.flashed_at)
+
+    def _monitor_step(self) -> None:
+        """Monitor the single target device."""
+        from .config import MonitorConfig
+        from .monitor import SerialMonitor
+
+        SerialMonitor(MonitorConfig(port=self._device_port())).monitor()
+
+    def _device_pipeline(self, target: str) -> None:
+        """Flash and/or upload one of several devices."""
+        flashed = self._flash(target) if self.flash else None
+        if self.upload:
+            self._upload(target, flashed)
+
+    def _deploy_all(self) -> None:
+        """Run the device pipeline on every port concurrently."""
+        _run_per_port(self.ports, self._device_pipeline, "Deployment")
 
 
 @app.command()
-@handle_errors
 def build(
-    board: Annotated[
-        str,
-        typer.Option("--board", "-b", help="ESP32 board variant"),
-    ] = "STRIPALERTS_S3",
-    clean: Annotated[
-        bool,
-        typer.Option("--clean", "-c", help="Clean before building"),
-    ] = False,
-    verbose: Annotated[
-        bool,
-        typer.Option("--verbose", "-v", help="Show verbose output"),
-    ] = False,
+    board: BoardOption = "STRIPALERTS_S3",
+    clean: CleanOption = False,
+    verbose: VerboseOption = False,
+    jobs: JobsOption = None,
 ) -> None:
     """Build firmware for ESP32 board."""
+    from .builder import FirmwareBuilder
+    from .config import BuildConfig
+
     paths = _paths()
-    config = BuildConfig(board=board, clean=clean, verbose=verbose)
+    config = BuildConfig(board=board, clean=clean, verbose=verbose, jobs=jobs)
     builder = FirmwareBuilder(config, paths)
     builder.build()
 
 
 @app.command()
-@handle_errors
 def flash(
-    board: Annotated[
-        str,
-        typer.Option("--board", "-b", help="ESP32 board variant"),
-    ] = "STRIPALERTS_S3",
-    port: Annotated[
-        str | None,
-        typer.Option("--port", "-p", help="Serial port (auto-detect if not set)"),
-    ] = None,
-    baud: Annotated[
-        int,
-        typer.Option("--baud", help="Baud rate for flashing"),
-    ] = FlashConfig.DEFAULT_FLASH_BAUD,
-    erase: Annotated[
-        bool,
-        typer.Option("--erase", "-e", help="Erase flash before flashing"),
-    ] = False,
+    board: BoardOption = "STRIPALERTS_S3",
+    port: PortOption = None,
+    baud: FlashBaudOption = FlashConfig.DEFAULT_FLASH_BAUD,
+    erase: EraseOption = False,
 ) -> None:
     """Flash firmware to ESP32 device."""
+    from .config import FlashingConfig
+    from .uploader import FirmwareUploader
+
     paths = _paths()
     config = FlashingConfig(board=board, port=port, baud=baud, erase=erase)
     uploader = FirmwareUploader(config, paths)
@@ -119,79 +256,83 @@ def flash(
 
 
 @app.command()
-@handle_errors
 def upload(
     port: Annotated[
-        str | None,
-        typer.Option("--port", "-p", help="Serial port (auto-detect if not set)"),
+        list[str] | None,
+        typer.Option(
+            "--port",
+            "-p",
+            help="Serial port; repeat to upload to several devices (auto-detect if not set)",
+        ),
     ] = None,
 ) -> None:
     """Upload application files to ESP32 device."""
+    from .config import UploadConfig
+    from .uploader import FileUploader
+
     paths = _paths()
-    config = UploadConfig(port=port)
+    ports = port or []
+    config = UploadConfig(port=ports[0] if ports else None)
     uploader = FileUploader(config, paths)
-    uploader.upload_files()
+    if len(ports) > 1:
+        uploader.prepare()
+        _run_per_port(ports, uploader.upload_files, "Upload")
+    else:
+        uploader.upload_files()
 
 
 @app.command()
-@handle_errors
 def monitor(
-    port: Annotated[
-        str | None,
-        typer.Option("--port", "-p", help="Serial port (auto-detect if not set)"),
-    ] = None,
+    port: PortOption = None,
     baud: Annotated[
         int,
         typer.Option("--baud", help="Baud rate for monitoring"),
     ] = FlashConfig.DEFAULT_MONITOR_BAUD,
 ) -> None:
     """Monitor serial output from ESP32 device."""
+    from .config import MonitorConfig
+    from .monitor import SerialMonitor
+
     config = MonitorConfig(port=port, baud=baud)
     serial_monitor = SerialMonitor(config)
     serial_monitor.monitor()
 
 
 @app.command()
-@handle_errors
 def clean(
     deep: Annotated[
         bool,
         typer.Option("--all", "-a", help="Deep clean including MicroPython artifacts"),
     ] = False,
+    purge_cache: Annotated[
+        bool,
+        typer.Option("--purge-cache", help="Also remove the shared MicroPython download cache"),
+    ] = False,
 ) -> None:
     """Clean build artifacts and caches."""
+    from .cleaner import BuildCleaner
+
     paths = _paths()
-    cleaner = BuildCleaner(paths, deep_clean=deep)
+    cleaner = BuildCleaner(paths, deep_clean=deep, purge_cache=purge_cache)
     cleaner.clean()
 
 
 @app.command()
-@handle_errors
 def deploy(  # noqa: PLR0913
-    board: Annotated[
-        str,
-        typer.Option("--board", "-b", help="ESP32 board variant"),
-    ] = "STRIPALERTS_S3",
+    board: BoardOption = "STRIPALERTS_S3",
     port: Annotated[
-        str | None,
-        typer.Option("--port", "-p", help="Serial port (auto-detect if not set)"),
+        list[str] | None,
+        typer.Option(
+            "--port",
+            "-p",
+            help="Serial port; repeat to deploy to several devices (auto-detect if not set)",
+        ),
     ] = None,
-    baud: Annotated[
-        int,
-        typer.Option("--baud", help="Baud rate for flashing"),
-    ] = FlashConfig.DEFAULT_FLASH_BAUD,
-    clean: Annotated[
-        bool,
-        typer.Option("--clean", "-c", help="Clean before building"),
-    ] = False,
-    verbose: Annotated[
-        bool,
-        typer.Option("--verbose", "-v", help="Show verbose output"),
-    ] = False,
-    erase: Annotated[
-        bool,
-        typer.Option("--erase", "-e", help="Erase flash before flashing"),
-    ] = False,
+    baud: FlashBaudOption = FlashConfig.DEFAULT_FLASH_BAUD,
+    clean: CleanOption = False,
+    verbose: VerboseOption = False,
+    jobs: JobsOption = None,
+    erase: EraseOption = False,
     skip_build: Annotated[
         bool,
         typer.Option("--skip-build", help="Skip build step"),
@@ -210,58 +351,60 @@ def deploy(  # noqa: PLR0913
     ] = False,
     stabilize_seconds: Annotated[
         float,
-        typer.Option("--stabilize-seconds", help="Seconds to wait after flash"),
+        typer.Option("--stabilize-seconds", help="Max seconds to wait for device after flash"),
     ] = RetryConfig.DEVICE_STABILIZE_DELAY,
 ) -> None:
     """Full deployment: build + flash + upload + monitor."""
+    ports = port or []
+    if len(ports) > 1 and not skip_monitor:
+        print_warning("Monitoring is skipped when deploying to several devices")
+        skip_monitor = True
+    if skip_build and skip_flash and skip_upload and skip_monitor:
+        print_info("No deployment steps were executed.")
+        return
+
+    from .builder import FirmwareBuilder
+    from .config import BuildConfig, FlashingConfig
+
     paths = _paths()
+    build_config = BuildConfig(board=board, clean=clean, verbose=verbose, jobs=jobs)
+    plan = _DeployPlan(
+        paths=paths,
+        flash_config=FlashingConfig(board=board, baud=baud, erase=erase),
+        ports=ports,
+        stabilize_seconds=stabilize_seconds,
+        build=None if skip_build else FirmwareBuilder(build_config, paths).build,
+        flash=not skip_flash,
+        upload=not skip_upload,
+        monitor=not skip_monitor,
+    )
+    plan.run()
 
-    def _upload_step() -> None:
-        if not skip_flash:
-            print_info(f"Waiting {stabilize_seconds}s for device stabilization...")
-            time.sleep(stabilize_seconds)
-        FileUploader(UploadConfig(port=port), paths).upload_files()
-
-    steps = [
-        (
-            "Building Firmware",
-            not skip_build,
-            lambda: FirmwareBuilder(
-                BuildConfig(board=board, clean=clean, verbose=verbose),
-                paths,
-            ).build(),
-        ),
-        (
-            "Flashing Firmware",
-            not skip_flash,
-            lambda: FirmwareUploader(
-                FlashingConfig(board=board, port=port, baud=baud, erase=erase),
-                paths,
-            ).upload(),
-        ),
-        ("Uploading Application Files", not skip_upload, _upload_step),
-        (
-            "Monitoring Device",
-            not skip_monitor,
-            lambda: SerialMonitor(MonitorConfig(port=port)).monitor(),
-        ),
-    ]
-    enabled = [(label, action) for label, on, action in steps if on]
-    total = len(enabled)
+    print_success("Deployment completed successfully!")
 
-    for counter, (label, action) in enumerate(enabled, start=1):
-        print_header(f"STEP {counter}/{total}: {label}")
-        action()
 
-    if total:
-        print_success("Deployment completed successfully!")
-    else:
-        print_info("No deployment steps were executed.")
+_click_app = typer.main.get_command(app)
 
 
 def main() -> None:
-    """CLI entry point."""
-    app()
+    """CLI entry point; maps errors to messages and exit codes in one place."""
+    try:
+        exit_code = _click_app(standalone_mode=False)
+    except StripAlertsError as e:
+        print_error(str(e))
+        sys.exit(1)
+    except (click.Abort, KeyboardInterrupt):
+        print_info("Stopped by user")
+        sys.exit(130)
+    except click.ClickException as e:
+        e.show()
+        sys.exit(e.exit_code)
+    except Exception as e:
+        print_error(f"Unexpected error: {e}")
+        sys.exit(1)
+
+    if isinstance(exit_code, int):
+        sys.exit(exit_code)
 
 
 if __name__ == "__main__":
@@ -2,11 +2,16 @@
 
 from __future__ import annotations
 
+import functools
+import os
+import sys
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
 from typing import ClassVar
 
+PROJECT_ROOT_ENV = "STRIPALERTS_PROJECT_ROOT"
+
 
 class ChipType(str, Enum):
     """Supported ESP32 chip types."""
@@ -19,33 +24,36 @@ class ChipType(str, Enum):
     ESP32H2 = "esp32h2"
 
     @classmethod
+    @functools.lru_cache(maxsize=32)
     def from_board(cls, board: str) -> ChipType:
-        """Determine chip type from board name."""
+        """Determine chip type from board name; cached per board."""
         board_upper = board.upper()
-        if "S3" in board_upper:
-            return cls.ESP32S3
-        if "S2" in board_upper:
-            return cls.ESP32S2
-        if "C3" in board_upper:
-            return cls.ESP32C3
-        if "C6" in board_upper:
-            return cls.ESP32C6
-        if "H2" in board_upper:
-            return cls.ESP32H2
+        for token, chip_type in _BOARD_CHIP_TOKENS:
+            if token in board_upper:
+                return chip_type
         return cls.ESP32
 
 
+_BOARD_CHIP_TOKENS = (
+    ("S3", ChipType.ESP32S3),
+    ("S2", ChipType.ESP32S2),
+    ("C3", ChipType.ESP32C3),
+    ("C6", ChipType.ESP32C6),
+    ("H2", ChipType.ESP32H2),
+)
+
+
 @dataclass(frozen=True)
 class FlashConfig:
     """Flash layout constants."""
 
-    BOOTLOADER_ADDR_MAP: ClassVar[dict[str, int]] = {
-        "esp32": 0x1000,
-        "esp32s2": 0x1000,
-        "esp32s3": 0x0,
-        "esp32c3": 0x0,
-        "esp32c6": 0x0,
-        "esp32h2": 0x0,
+    BOOTLOADER_ADDR_MAP: ClassVar[dict[ChipType, int]] = {
+        ChipType.ESP32: 0x1000,
+        ChipType.ESP32S2: 0x1000,
+        ChipType.ESP32S3: 0x0,
+        ChipType.ESP32C3: 0x0,
+        ChipType.ESP32C6: 0x0,
+        ChipType.ESP32H2: 0x0,
     }
 
     PARTITION_TABLE_ADDR: ClassVar[int] = 0x8000
@@ -57,7 +65,17 @@ class FlashConfig:
     @classmethod
     def get_bootloader_addr(cls, chip_type: ChipType) -> int:
         """Return bootloader address for chip type."""
-        return cls.BOOTLOADER_ADDR_MAP.get(chip_type.value, 0x0)
+        return cls.BOOTLOADER_ADDR_MAP.get(chip_type, 0x0)
+
+    @classmethod
+    @functools.cache
+    def flash_layout(cls, chip_type: ChipType) -> tuple[tuple[str, str], ...]:
+        """Return `(hex address, dist/ file name)` pairs to flash for chip type."""
+        return (
+            (hex(cls.get_bootloader_addr(chip_type)), "bootloader.bin"),
+            (hex(cls.PARTITION_TABLE_ADDR), "partition-table.bin"),
+            (hex(cls.FIRMWARE_ADDR), "firmware.bin"),
+        )
 
 
 @dataclass(frozen=True)
@@ -65,24 +83,44 @@ class RetryConfig:
     """Retry and timeout constants."""
 
     MAX_RETRIES: ClassVar[int] = 3
-    RETRY_DELAY: ClassVar[float] = 1.0
+    RETRY_DELAY: ClassVar[float] = 0.25
+    RETRY_BACKOFF: ClassVar[float] = 2.0
     OPERATION_TIMEOUT: ClassVar[int] = 60
     DEVICE_STABILIZE_DELAY: ClassVar[float] = 5.0
+    DEVICE_SETTLE_DELAY: ClassVar[float] = 1.0
+    DEVICE_POLL_INTERVAL: ClassVar[float] = 0.05
+
+
+def user_cache_dir() -> Path:
+    """Return the per-user cache directory, honouring `XDG_CACHE_HOME`."""
+    cache_home = os.environ.get("XDG_CACHE_HOME")
+    base = Path(cache_home) if cache_home else Path.home() / ".cache"
+    return base / "stripalerts"
 
 
-@dataclass
+def micropython_cache_dir() -> Path:
+    """Return the shared MicroPython git object cache directory."""
+    return user_cache_dir() / "micropython"
+
+
+@dataclass(slots=True)
 class ChipTypeMixin:
     """Adds a chip type derived from board name."""
 
     board: str
+    _chip_type: ChipType = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """Resolve the chip type once, at construction."""
+        self._chip_type = ChipType.from_board(self.board)
 
     @property
     def chip_type(self) -> ChipType:
         """Get chip type for this board."""
-        return ChipType.from_board(self.board)
+        return self._chip_type
 
 
-@dataclass
+@dataclass(slots=True)
 class ProjectPaths:
     """Project directory paths."""
 
@@ -90,18 +128,22 @@ class ProjectPaths:
     src: Path = field(init=False)
     dist: Path = field(init=False)
     boards: Path = field(init=False)
+    modules: Path = field(init=False)
     micropython: Path = field(init=False)
     micropython_esp32: Path = field(init=False)
     mpy_cross: Path = field(init=False)
 
     def __post_init__(self) -> None:
-        """Initialize derived paths."""
-        self.src = self.root / "src"
-        self.dist = self.root / "dist"
-        self.boards = self.root / "boards"
-        self.micropython = self.root / "micropython"
-        self.micropython_esp32 = self.micropython / "ports" / "esp32"
-        self.mpy_cross = self.micropython / "mpy-cross"
+        """Initialize derived paths, joining strings and wrapping each in `Path` once."""
+        root = os.fspath(self.root)
+        join = os.path.join
+        self.src = Path(join(root, "src"))
+        self.dist = Path(join(root, "dist"))
+        self.boards = Path(join(root, "boards"))
+        self.modules = Path(join(root, "modules"))
+        self.micropython = Path(join(root, "micropython"))
+        self.micropython_esp32 = Path(join(root, "micropython", "ports", "esp32"))
+        self.mpy_cross = Path(join(root, "micropython", "mpy-cross"))
 
     def build_dir(self, board: str) -> Path:
         """Get build directory for specific board."""
@@ -112,22 +154,32 @@ class ProjectPaths:
         return self.boards / board
 
     @classmethod
+    @functools.cache
     def from_tools_dir(cls) -> ProjectPaths:
-        """Create ProjectPaths from tools directory location."""
+        """Create ProjectPaths from tools directory location; resolved once per process.
+
+        Frozen/compiled binaries have no source tree beside them, so their root
+        comes from `STRIPALERTS_PROJECT_ROOT`, defaulting to the working directory.
+        """
+        if getattr(sys, "frozen", False) or "__compiled__" in globals():
+            root = os.environ.get(PROJECT_ROOT_ENV) or os.getcwd()
+            return cls(root=Path(root).resolve())
+
         tools_dir = Path(__file__).parent
         return cls(root=tools_dir.parent.resolve())
 
 
-@dataclass
+@dataclass(slots=True)
 class BuildConfig(ChipTypeMixin):
     """Build command options."""
 
     board: str = "STRIPALERTS_S3"
     clean: bool = False
     verbose: bool = False
+    jobs: int | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class FlashingConfig(ChipTypeMixin):
     """Flash command options."""
 
@@ -137,7 +189,7 @@ class FlashingConfig(ChipTypeMixin):
     erase: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class MonitorConfig:
     """Monitor command options."""
 
@@ -145,7 +197,7 @@ class MonitorConfig:
     baud: int = FlashConfig.DEFAULT_MONITOR_BAUD
 
 
-@dataclass
+@dataclass(slots=True)
 class UploadConfig:
     """Upload command options."""
 
@@ -2,45 +2,110 @@
 
 from __future__ import annotations
 
+import os
+import re
 import shlex
+import sys
+import threading
+import time
 from contextlib import contextmanager
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Final
 
 if TYPE_CHECKING:
-    from collections.abc import Iterator
+    from collections.abc import Iterable, Iterator, Sequence
     from types import TracebackType
 
+    from rich.console import Console
     from typing_extensions import Self
 
-from rich.console import Console
-from rich.panel import Panel
-from rich.progress import (
-    BarColumn,
-    Progress,
-    SpinnerColumn,
-    TaskProgressColumn,
-    TextColumn,
-    TimeElapsedColumn,
-)
-from rich.theme import Theme
-
-STRIPALERTS_THEME = Theme(
-    {
-        "info": "cyan",
-        "success": "bold green",
-        "warning": "bold yellow",
-        "error": "bold red",
-        "header": "bold magenta",
-        "code": "bold blue",
-        "path": "italic cyan",
-    },
+# Rich costs noticeable import time; scripted and CI runs get plain text instead.
+USE_RICH = bool(os.environ.get("FORCE_COLOR")) or (
+    sys.stdout.isatty() and not os.environ.get("NO_COLOR")
 )
 
-console = Console(theme=STRIPALERTS_THEME)
+# Same tag grammar rich uses, so plain output drops exactly what rich would style.
+_MARKUP_RE = re.compile(r"(?<!\\)\[[a-z#/@][^[]*?\]")
+
+
+class _PlainConsole:
+    """Print-based stand-in for `rich.console.Console` that strips markup.
+
+    Every line is flushed at once so it stays ordered with output that child
+    processes write straight to the inherited stdout; only lines printed inside
+    `with console:` are held and written together on exit.
+    """
+
+    def __init__(self) -> None:
+        """Set up per-thread buffering state."""
+        self._local = threading.local()
+
+    def print(self, message: str = "") -> None:
+        """Write `message` without markup."""
+        line = _MARKUP_RE.sub("", message) + "\n"
+        buffer: list[str] | None = getattr(self._local, "buffer", None)
+        if buffer is not None:
+            buffer.append(line)
+            return
+        sys.stdout.write(line)
+        sys.stdout.flush()
+
+    def __enter__(self) -> Self:
+        """Start holding this thread's lines back; nested entries share one buffer."""
+        self._local.depth = getattr(self._local, "depth", 0) + 1
+        if self._local.depth == 1:
+            self._local.buffer = []
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        """Write the held lines in one flush once the outermost entry exits."""
+        self._local.depth -= 1
+        if self._local.depth:
+            return
+        buffer = self._local.buffer
+        self._local.buffer = None
+        sys.stdout.write("".join(buffer))
+        sys.stdout.flush()
+
+
+if USE_RICH:
+    from rich.console import Console
+    from rich.panel import Panel
+    from rich.theme import Theme
+
+    STRIPALERTS_THEME: Final = Theme(
+        {
+            "info": "cyan",
+            "success": "bold green",
+            "warning": "bold yellow",
+            "error": "bold red",
+            "header": "bold magenta",
+            "code": "bold blue",
+            "path": "italic cyan",
+        },
+    )
+
+    console: Console | _PlainConsole = Console(
+        theme=STRIPALERTS_THEME,
+        highlight=False,
+        log_time=False,
+    )
+else:
+    console = _PlainConsole()
 
 
 def print_header(title: str, subtitle: str | None = None) -> None:
     """Print a styled header panel."""
+    if not USE_RICH:
+        console.print(f"\n=== {title} ===")
+        if subtitle:
+            console.print(subtitle)
+        return
+
     content = f"[header]{title}[/header]"
     if subtitle:
         content += f"\n[dim]{subtitle}[/dim]"
@@ -75,6 +140,14 @@ def print_file_operation(operation: str, path: str, success: bool = True) -> Non
     console.print(f"[{style}]{operation}[/{style}] [path]{path}[/path]")
 
 
+def print_file_operations(operation: str, paths: Iterable[str], success: bool = True) -> None:
+    """Print the same operation for several paths in a single console write."""
+    style = "success" if success else "error"
+    lines = [f"[{style}]{operation}[/{style}] [path]{path}[/path]" for path in paths]
+    if lines:
+        console.print("\n".join(lines))
+
+
 def print_command(cmd: list[str]) -> None:
     """Print a command being executed."""
     cmd_str = shlex.join(cmd)
@@ -86,31 +159,52 @@ def print_keyval(key: str, value: Any) -> None:
     console.print(f"  [bold]{key}:[/bold] {value}")
 
 
+def print_table(title: str, columns: Sequence[str], rows: Iterable[Sequence[str]]) -> None:
+    """Print a table; columns after the first are right-aligned."""
+    if not USE_RICH:
+        console.print(title)
+        for row in (columns, *rows):
+            console.print("  ".join(row))
+        return
+
+    from rich.table import Table
+
+    table = Table(title=title, title_style="header", header_style="bold")
+    for index, column in enumerate(columns):
+        table.add_column(column, justify="left" if index == 0 else "right")
+    for row in rows:
+        table.add_row(*row)
+    console.print(table)
+
+
 @contextmanager
-def progress_bar() -> Iterator[Progress]:
-    """Create a progress bar context manager."""
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        BarColumn(),
-        TaskProgressColumn(),
-        TimeElapsedColumn(),
-        console=console,
-    ) as progress:
-        yield progress
+def buffered_console() -> Iterator[None]:
+    """Collect console output and write it in a single flush on exit.
+
+    Only wrap quick runs of prints; anything streamed inside is held back.
+    """
+    with console:
+        yield
 
 
 class StatusLogger:
     """Context manager for operation status."""
 
-    def __init__(self, operation: str) -> None:
-        """Initialize status logger."""
+    def __init__(
+        self,
+        operation: str,
+        timings: list[tuple[str, float, float]] | None = None,
+    ) -> None:
+        """Initialize status logger, optionally recording `(name, start, end)` into `timings`."""
         self.operation = operation
         self.start_msg = f"[info]{operation}...[/info]"
+        self.timings = timings
+        self.start = 0.0
 
     def __enter__(self) -> Self:
         """Start operation."""
         console.print(self.start_msg)
+        self.start = time.perf_counter()
         return self
 
     def __exit__(
@@ -120,6 +214,8 @@ class StatusLogger:
         exc_tb: TracebackType | None,
     ) -> None:
         """Complete operation."""
+        if self.timings is not None:
+            self.timings.append((self.operation, self.start, time.perf_counter()))
         if exc_type is None:
             print_success(f"{self.operation} completed")
         else:
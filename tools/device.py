@@ -2,21 +2,39 @@
 
 from __future__ import annotations
 
+import contextlib
+import importlib.util
+import json
 import os
 import sys
 import time
+from functools import lru_cache
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-try:
-    from serial.tools import list_ports
-except ImportError:
-    list_ports = None
-
+from .config import RetryConfig, user_cache_dir
 from .console import print_info, print_success, print_warning
 from .exceptions import CommandError, DeviceNotFoundError, OperationTimeoutError, PrerequisiteError
 from .subprocess_utils import check_command_available, get_command_output, run_command
 
-ESP32_VID_PIDS = [(0x10C4, 0xEA60), (0x1A86, 0x7523), (0x303A, None)]
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from concurrent.futures import Executor, Future
+    from types import ModuleType
+
+    from serial.tools.list_ports_common import ListPortInfo
+
+# USB vendor ID -> accepted product IDs; None accepts any product from that vendor.
+ESP32_VID_MAP: dict[int, frozenset[int | None]] = {
+    0x10C4: frozenset({0xEA60}),
+    0x1A86: frozenset({0x7523}),
+    0x303A: frozenset({None}),
+}
+IDF_CACHE_FILE = "idf.json"
+PORT_CACHE_TTL = 3.0
+DEV_PORT_PREFIXES = ("ttyUSB", "ttyACM", "cu.usb", "cu.wchusbserial")
+
+_deep_probe = False
 
 
 class ESP32Device:
@@ -49,22 +67,26 @@ class ESP32Device:
         print_warning(f"Reset failed on {self.port}")
         return False
 
-    def interrupt_program(self, timeout: int = 5) -> bool:
-        """Interrupt a running program."""
-        return self._run_mpremote(
-            self._mpremote_cmd("exec", ""),
-            timeout=timeout,
-        )
-
-    def remove_file(self, remote_path: str, timeout: int = 5) -> bool:
-        """Remove a file from device filesystem."""
-        cmd = self._mpremote_cmd("fs", "rm", f":{remote_path}")
-        return self._run_mpremote(cmd, timeout=timeout, check=False)
-
-    def copy_file(self, local_path: str, remote_path: str, timeout: int = 30) -> bool:
-        """Copy a local file to device filesystem."""
-        cmd = self._mpremote_cmd("fs", "cp", local_path, f":{remote_path}")
-        return self._run_mpremote(cmd, timeout=timeout, check=False)
+    def exec_output(self, code: str, timeout: int = 10) -> str | None:
+        """Run MicroPython `code` on the device and return its output, or None on failure."""
+        try:
+            result = run_command(
+                self._mpremote_cmd("exec", code),
+                timeout=timeout,
+                capture_output=True,
+            )
+        except (OSError, CommandError, OperationTimeoutError):
+            return None
+        return result.stdout.decode("utf-8", errors="replace")
+
+    def run_batch(self, commands: Sequence[Sequence[str]], timeout: int = 30) -> bool:
+        """Run several mpremote commands chained with `+` over one connection."""
+        args: list[str] = []
+        for command in commands:
+            if args:
+                args.append("+")
+            args.extend(command)
+        return self._run_mpremote(self._mpremote_cmd(*args), timeout=timeout, check=False)
 
     def _mpremote_cmd(self, *args: str) -> list[str]:
         """Build an mpremote command for this device."""
@@ -80,12 +102,7 @@ class ESP32Device:
     ) -> bool:
         """Run an mpremote command and return success."""
         try:
-            result = run_command(
-                cmd,
-                timeout=timeout,
-                capture_output=True,
-                check=check,
-            )
+            result = run_command(cmd, timeout=timeout, check=check, quiet=True)
         except (OSError, CommandError, OperationTimeoutError):
             return False
 
@@ -111,29 +128,75 @@ def _find_esp32_via_esptool() -> str | None:
     return None
 
 
+@lru_cache(maxsize=1)
+def _list_ports() -> ModuleType | None:
+    """Import `serial.tools.list_ports` on first use; None without pyserial."""
+    try:
+        from serial.tools import list_ports
+    except ImportError:
+        return None
+    return list_ports
+
+
+class _PortCache:
+    """Serial port listing reused by lookups made within `PORT_CACHE_TTL` seconds."""
+
+    def __init__(self) -> None:
+        """Start with an expired listing."""
+        self.stamp = float("-inf")
+        self.ports: list[ListPortInfo] = []
+
+    def comports(self, *, fresh: bool = False) -> list[ListPortInfo] | None:
+        """Return the current ports, or None without pyserial; `fresh` forces a re-scan."""
+        list_ports = _list_ports()
+        if list_ports is None:
+            return None
+
+        now = time.monotonic()
+        if fresh or now - self.stamp >= PORT_CACHE_TTL:
+            self.ports = list(list_ports.comports())
+            self.stamp = now
+        return self.ports
+
+
+_port_cache = _PortCache()
+
+
+def _is_esp32_port(port_info: ListPortInfo) -> bool:
+    """Return whether the port's USB VID/PID belongs to a known ESP32 bridge."""
+    pids = ESP32_VID_MAP.get(port_info.vid)
+    return pids is not None and (None in pids or port_info.pid in pids)
+
+
 def _find_esp32_via_serial_ports() -> str | None:
     """Try to find ESP32 device using pyserial list_ports."""
-    if list_ports is None:
+    ports = _port_cache.comports()
+    if ports is None:
         return None
 
-    for port_info in list_ports.comports():
-        for vid, pid in ESP32_VID_PIDS:
-            if port_info.vid == vid and (pid is None or port_info.pid == pid):
-                print_success(f"Found ESP32 on port: {port_info.device}")
-                return port_info.device
+    for port_info in ports:
+        if _is_esp32_port(port_info):
+            print_success(f"Found ESP32 on port: {port_info.device}")
+            return port_info.device
     return None
 
 
-def _find_esp32_via_dev_patterns() -> str | None:
+def _find_esp32_via_dev_patterns(*, quiet: bool = False) -> str | None:
     """Try to find ESP32 device by searching /dev patterns (Unix-like systems)."""
     if sys.platform == "win32":
         return None
 
-    patterns = ["ttyUSB*", "ttyACM*", "cu.usb*", "cu.wchusbserial*"]
-    ports = sorted(str(p) for pattern in patterns for p in Path("/dev").glob(pattern))
+    try:
+        with os.scandir("/dev") as entries:
+            ports = sorted(
+                entry.path for entry in entries if entry.name.startswith(DEV_PORT_PREFIXES)
+            )
+    except OSError:
+        return None
     if ports:
         port = ports[0]
-        print_warning(f"Using port: {port} (pattern-based guess)")
+        if not quiet:
+            print_warning(f"Using port: {port} (pattern-based guess)")
         return port
     return None
 
@@ -150,23 +213,130 @@ def find_esp32_device() -> str:
         if port:
             return port
 
-    if list_ports is not None:
-        all_ports_info = list(list_ports.comports())
-        if all_ports_info:
-            port = all_ports_info[0].device
-            print_warning(
-                f"No ESP32 VID/PID match found; using first available port as fallback: {port}",
-            )
-            return port
-
-    port = _find_esp32_via_esptool()
-    if port:
+    all_ports_info = _port_cache.comports()
+    if all_ports_info:
+        port = all_ports_info[0].device
+        print_warning(
+            f"No ESP32 VID/PID match found; using first available port as fallback: {port}",
+        )
         return port
 
+    if _deep_probe:
+        port = _find_esp32_via_esptool()
+        if port:
+            return port
+
     msg = "No ESP32 device found. Please connect device or specify --port"
+    if not _deep_probe:
+        msg += " (or retry with --deep-probe to query the chip via esptool)"
     raise DeviceNotFoundError(msg)
 
 
+def enable_deep_probe() -> None:
+    """Let `find_esp32_device` fall back to the slow esptool chip probe."""
+    global _deep_probe
+    _deep_probe = True
+
+
+def _device_present(port: str | None) -> bool:
+    """Return whether `port`, or any recognizable ESP32 port, is currently present."""
+    if port and sys.platform != "win32":
+        return os.path.exists(port)
+
+    ports = _port_cache.comports(fresh=True)
+    if ports is None:
+        if port:
+            return True
+        return _find_esp32_via_dev_patterns(quiet=True) is not None
+
+    for port_info in ports:
+        if port:
+            if port_info.device == port:
+                return True
+            continue
+        if _is_esp32_port(port_info):
+            return True
+    return False
+
+
+def _port_opens(port: str | None) -> bool:
+    """Return whether `port` can be opened, with DTR/RTS idle so the chip is not reset.
+
+    A port that has just reappeared may still be owned by udev or the USB
+    stack. Without pyserial, or without a specific port, presence is enough.
+    """
+    if not port or not check_pyserial():
+        return True
+
+    import serial
+
+    ser = serial.Serial()
+    ser.port = port
+    ser.timeout = 0
+    ser.dtr = False
+    ser.rts = False
+    try:
+        ser.open()
+    except (serial.SerialException, OSError):
+        return False
+    ser.close()
+    return True
+
+
+def wait_for_device(port: str | None, timeout: float) -> bool:
+    """Wait until the device's serial port is present and opens, for at most `timeout` seconds.
+
+    Always waits `RetryConfig.DEVICE_SETTLE_DELAY` first so a device whose USB
+    bridge never drops off the bus still gets time to boot. Returns False on
+    timeout.
+    """
+    deadline = time.monotonic() + timeout
+    time.sleep(max(0.0, min(RetryConfig.DEVICE_SETTLE_DELAY, timeout)))
+    while not (_device_present(port) and _port_opens(port)):
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(RetryConfig.DEVICE_POLL_INTERVAL)
+    return True
+
+
+def _preload_esptool() -> None:
+    """Import esptool so the first in-process flash does not pay for it."""
+    with contextlib.suppress(ImportError):
+        importlib.import_module("esptool")
+
+
+def prefetch_port(
+    executor: Executor,
+    port: str | None,
+    *,
+    preload_esptool: bool = False,
+) -> Future[str] | None:
+    """Start finding the device port on `executor`, optionally importing esptool too.
+
+    Lets slow work such as a build overlap device discovery. Returns None when
+    `port` is already known; hand the result to `resolve_port`.
+    """
+    if preload_esptool:
+        executor.submit(_preload_esptool)
+    if port:
+        return None
+    return executor.submit(find_esp32_device)
+
+
+def resolve_port(port: str | None, lookup: Future[str] | None = None) -> str:
+    """Return `port`, else the port found by `lookup`, else auto-detect now.
+
+    A lookup that found nothing is retried, since the board may have been
+    plugged in while it ran.
+    """
+    if port:
+        return port
+    if lookup is not None:
+        with contextlib.suppress(DeviceNotFoundError):
+            return lookup.result()
+    return find_esp32_device()
+
+
 def get_or_find_port(port: str | None) -> str:
     """Return specified port or auto-detect one."""
     if port:
@@ -182,29 +352,48 @@ def check_mpremote() -> None:
         raise PrerequisiteError(msg)
 
 
-def check_idf_environment() -> tuple[Path, list[str]]:
-    """Validate ESP-IDF environment and return `(idf_path, idf_cmd)`."""
-    esp_idf_path = os.environ.get("IDF_PATH")
-    if not esp_idf_path:
-        msg = (
-            "IDF_PATH not set. Run: source ~/esp/esp-idf/export.sh "
-            "(adjust path to your ESP-IDF installation)"
-        )
-        raise PrerequisiteError(msg)
+def _idf_cache_key(idf_path: Path) -> tuple[str | int, ...]:
+    """Return the key that invalidates a cached idf.py lookup."""
+    try:
+        export_mtime = (idf_path / "export.sh").stat().st_mtime_ns
+    except OSError:
+        export_mtime = 0
+    return (str(idf_path), export_mtime, os.environ.get("PATH", ""), sys.executable)
 
-    idf_path = Path(esp_idf_path)
 
+def _read_idf_cache(key: tuple[str | int, ...]) -> list[str] | None:
+    """Return the cached idf.py command for `key`, if any."""
+    try:
+        data = json.loads((user_cache_dir() / IDF_CACHE_FILE).read_text())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("key") != list(key):
+        return None
+    cmd = data.get("cmd")
+    if not isinstance(cmd, list) or not all(isinstance(part, str) for part in cmd):
+        return None
+    return cmd
+
+
+def _write_idf_cache(key: tuple[str | int, ...], cmd: list[str]) -> None:
+    """Persist the idf.py command for `key`; failures are ignored."""
+    cache_file = user_cache_dir() / IDF_CACHE_FILE
+    with contextlib.suppress(OSError):
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        cache_file.write_text(json.dumps({"key": list(key), "cmd": cmd}))
+
+
+def _detect_idf_command(idf_path: Path) -> list[str]:
+    """Locate a runnable idf.py command."""
     if check_command_available("idf.py"):
-        print_success(f"ESP-IDF found at: {idf_path}")
-        return idf_path, ["idf.py"]
+        return ["idf.py"]
 
     idf_py_path = idf_path / "tools" / "idf.py"
     if idf_py_path.exists():
         cmd = [sys.executable, str(idf_py_path)]
         output = get_command_output([*cmd, "--version"])
         if output:
-            print_success(f"ESP-IDF found at: {idf_path}")
-            return idf_path, cmd
+            return cmd
         msg = (
             f"idf.py found at {idf_py_path} but could not be executed. "
             "Check file permissions and that Python can run it. "
@@ -219,6 +408,40 @@ def check_idf_environment() -> tuple[Path, list[str]]:
     raise PrerequisiteError(msg)
 
 
+@lru_cache(maxsize=4)
+def _resolve_idf_command(idf_path: Path, key: tuple[str | int, ...]) -> tuple[str, ...]:
+    """Return the idf.py command, consulting the on-disk cache first."""
+    cmd = _read_idf_cache(key)
+    if cmd is None:
+        cmd = _detect_idf_command(idf_path)
+        _write_idf_cache(key, cmd)
+    return tuple(cmd)
+
+
+def clear_check_caches() -> None:
+    """Forget cached tool lookups, including the on-disk idf.py cache."""
+    check_command_available.cache_clear()
+    _resolve_idf_command.cache_clear()
+    with contextlib.suppress(FileNotFoundError):
+        (user_cache_dir() / IDF_CACHE_FILE).unlink()
+
+
+def check_idf_environment() -> tuple[Path, list[str]]:
+    """Validate ESP-IDF environment and return `(idf_path, idf_cmd)`."""
+    esp_idf_path = os.environ.get("IDF_PATH")
+    if not esp_idf_path:
+        msg = (
+            "IDF_PATH not set. Run: source ~/esp/esp-idf/export.sh "
+            "(adjust path to your ESP-IDF installation)"
+        )
+        raise PrerequisiteError(msg)
+
+    idf_path = Path(esp_idf_path)
+    idf_cmd = _resolve_idf_command(idf_path, _idf_cache_key(idf_path))
+    print_success(f"ESP-IDF found at: {idf_path}")
+    return idf_path, list(idf_cmd)
+
+
 def check_pyserial() -> bool:
-    """Return whether pyserial is available."""
-    return list_ports is not None
+    """Return whether pyserial is installed, without importing it."""
+    return importlib.util.find_spec("serial") is not None
@@ -0,0 +1,202 @@
+"""Filesystem helpers."""
+
+from __future__ import annotations
+
+import contextlib
+import errno
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from io import BufferedReader, BufferedWriter
+    from pathlib import Path
+
+COPY_BUFFER_SIZE = 1 << 20
+
+_LINK_FALLBACK_ERRNOS = frozenset(
+    {errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP, errno.EOPNOTSUPP},
+)
+
+FICLONE = 0x40049409
+
+_RM_PATH = None if sys.platform == "win32" else shutil.which("rm")
+_RM = os.fsencode(_RM_PATH) if _RM_PATH else None
+
+
+def _ficlone(src_fd: int, dst_fd: int) -> bool:
+    """Share `src_fd`'s blocks with `dst_fd` via the Linux `FICLONE` ioctl."""
+    if not sys.platform.startswith("linux"):
+        return False
+
+    import fcntl
+
+    try:
+        fcntl.ioctl(dst_fd, FICLONE, src_fd)
+    except OSError:
+        return False
+    return True
+
+
+def _clonefile(src: str | Path, dst: str | Path) -> bool:
+    """Clone `src` to `dst` with macOS `clonefile(2)`; `dst` must not exist."""
+    if sys.platform != "darwin":
+        return False
+
+    import ctypes
+
+    libc = ctypes.CDLL(None, use_errno=True)
+    clonefile = getattr(libc, "clonefile", None)
+    if clonefile is None:
+        return False
+    return clonefile(os.fsencode(src), os.fsencode(dst), 0) == 0
+
+
+def _copy_file_range(src_fd: int, dst_fd: int, size: int) -> bool:
+    """Copy with `copy_file_range`; return False if unsupported."""
+    if not hasattr(os, "copy_file_range"):
+        return False
+
+    offset = 0
+    while offset < size:
+        try:
+            sent = os.copy_file_range(src_fd, dst_fd, size - offset)
+        except OSError as e:
+            if offset == 0 and e.errno != errno.ENOSPC:
+                return False
+            raise
+        if sent == 0:
+            break
+        offset += sent
+    return True
+
+
+def _sendfile(src_fd: int, dst_fd: int, size: int) -> bool:
+    """Copy with `sendfile`; return False if unsupported."""
+    if not hasattr(os, "sendfile"):
+        return False
+
+    offset = 0
+    while offset < size:
+        try:
+            sent = os.sendfile(dst_fd, src_fd, None, size - offset)
+        except OSError as e:
+            if offset == 0 and e.errno != errno.ENOSPC:
+                return False
+            raise
+        if sent == 0:
+            break
+        offset += sent
+    return True
+
+
+def _copy_buffered(fsrc: BufferedReader, fdst: BufferedWriter) -> None:
+    """Copy through a reusable userspace buffer."""
+    buf = bytearray(COPY_BUFFER_SIZE)
+    view = memoryview(buf)
+    while n := fsrc.readinto(buf):
+        fdst.write(view[:n])
+
+
+def fast_copy(src: str | Path, dst: str | Path) -> str | Path:
+    """Copy file data and metadata, replacing `dst`.
+
+    Tries a reflink (`clonefile` on macOS, `FICLONE` on Linux) so the copy
+    shares blocks with `src`, then `copy_file_range`, then `sendfile`, then a
+    1 MiB buffered loop. An existing `dst` is unlinked first so hard links to
+    it are never written through.
+    """
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(dst)
+
+    if _clonefile(src, dst):
+        return dst
+
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        src_fd, dst_fd = fsrc.fileno(), fdst.fileno()
+        size = os.fstat(src_fd).st_size
+        if not (
+            _ficlone(src_fd, dst_fd)
+            or _copy_file_range(src_fd, dst_fd, size)
+            or _sendfile(src_fd, dst_fd, size)
+        ):
+            _copy_buffered(fsrc, fdst)
+
+    shutil.copystat(src, dst)
+    return dst
+
+
+def link_or_copy(src: str | Path, dst: str | Path) -> None:
+    """Hard link `src` to `dst`, copying when linking is not possible."""
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(dst)
+
+    try:
+        os.link(src, dst)
+    except OSError as e:
+        if e.errno not in _LINK_FALLBACK_ERRNOS:
+            raise
+        fast_copy(src, dst)
+
+
+def file_sha256(path: str | Path) -> str:
+    """Return the hex sha256 of `path`, hashed in chunks instead of read whole."""
+    with open(path, "rb") as f:
+        if sys.version_info >= (3, 11):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+
+        digest = hashlib.sha256()
+        buf = bytearray(COPY_BUFFER_SIZE)
+        view = memoryview(buf)
+        while n := f.readinto(buf):
+            digest.update(view[:n])
+    return digest.hexdigest()
+
+
+def _walk_rmtree(path: str) -> None:
+    """Remove a tree bottom-up with `os.walk`, without recursive Python frames."""
+    for root, dirs, files in os.walk(path, topdown=False):
+        for name in files:
+            os.unlink(os.path.join(root, name))
+        for name in dirs:
+            dir_path = os.path.join(root, name)
+            if os.path.islink(dir_path):
+                os.unlink(dir_path)
+            else:
+                os.rmdir(dir_path)
+    os.rmdir(path)
+
+
+def fast_rmtree(*paths: str | Path) -> None:
+    """Remove directory trees with native tools, else an `os.walk` sweep.
+
+    On POSIX all trees go to a single `rm -rf` invocation; on Windows each
+    tree gets `rd /s /q`. Anything the native tools leave behind is removed
+    bottom-up with `os.walk`, which raises on failure.
+    """
+    targets = [os.fspath(path) for path in paths]
+    commands: list[list[bytes]] | list[list[str]]
+    if _RM is not None:
+        commands = [[_RM, b"-rf", b"--", *map(os.fsencode, targets)]]
+    elif sys.platform == "win32":
+        commands = [["cmd", "/c", "rd", "/s", "/q", target] for target in targets]
+    else:
+        commands = []
+
+    for cmd in commands:
+        with contextlib.suppress(subprocess.CalledProcessError, OSError):
+            subprocess.run(
+                cmd,
+                check=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+
+    for target in targets:
+        if os.path.islink(target):
+            os.unlink(target)
+        elif os.path.lexists(target):
+            _walk_rmtree(target)
@@ -2,23 +2,26 @@
 
 from __future__ import annotations
 
+import queue
+import sys
+import threading
 import time
 from typing import TYPE_CHECKING
 
-from .console import console, print_header, print_info, print_warning
+from .console import print_header, print_info, print_warning
 from .device import check_pyserial, get_or_find_port
 from .subprocess_utils import check_command_available, run_interactive
 
 if TYPE_CHECKING:
-    from .config import MonitorConfig
-
-try:
     import serial
-except ImportError:
-    serial = None
 
+    from .config import MonitorConfig
 
 EXIT_SIGINT = 130
+QUEUE_POLL_INTERVAL = 0.1
+
+# Serial chunks, or the error that stopped the reader thread.
+_Chunk = bytes | BaseException
 
 
 class SerialMonitor:
@@ -53,6 +56,8 @@ class SerialMonitor:
 
     def _monitor_pyserial(self, port: str) -> None:
         """Monitor serial output using pyserial library."""
+        import serial
+
         print_header("Serial Monitor (pyserial)", f"Port: {port} | Baud: {self.config.baud}")
         print_info("Press Ctrl+C to exit\n")
 
@@ -60,22 +65,95 @@ class SerialMonitor:
             with serial.Serial(port, self.config.baud, timeout=1) as ser:
                 self._start_application(ser)
 
-                while True:
-                    if ser.in_waiting:
-                        try:
-                            line = ser.readline().decode("utf-8", errors="replace").rstrip()
-                            console.print(line)
-                        except (serial.SerialException, UnicodeDecodeError) as e:
-                            print_warning(f"Read error: {e}")
-                    else:
-                        time.sleep(0.01)
+                chunks: queue.SimpleQueue[_Chunk] = queue.SimpleQueue()
+                stop = threading.Event()
+                reader = threading.Thread(
+                    target=self._read_serial,
+                    args=(ser, chunks, stop),
+                    name="serial-reader",
+                    daemon=True,
+                )
+                reader.start()
+                try:
+                    self._write_output(chunks)
+                finally:
+                    stop.set()
         except KeyboardInterrupt:
             print_info("Monitoring stopped")
         except (serial.SerialException, OSError) as e:
             print_warning(f"Monitor error: {e}")
 
-    def _start_application(self, ser: "serial.Serial") -> None:
+    def _read_serial(
+        self,
+        ser: serial.Serial,
+        chunks: queue.SimpleQueue[_Chunk],
+        stop: threading.Event,
+    ) -> None:
+        """Drain the UART into `chunks` so a slow stdout never backs it up."""
+        import serial
+
+        while not stop.is_set():
+            try:
+                # Blocks for up to `timeout`, then drains whatever has arrived.
+                chunk = ser.read(ser.in_waiting or 1)
+            except (serial.SerialException, OSError) as e:
+                # A port-level failure (unplugged, reset) does not recover; end the monitor.
+                if not stop.is_set():
+                    chunks.put(e)
+                return
+            if chunk:
+                chunks.put(chunk)
+
+    def _write_output(self, chunks: queue.SimpleQueue[_Chunk]) -> None:
+        """Copy `chunks` to stdout until the reader fails or the user stops.
+
+        Complete lines are written as they arrive; a partial line such as the
+        `>>> ` prompt is written once the port goes quiet, and on shutdown.
+        """
+        out = sys.stdout.buffer
+        pending = bytearray()
+        try:
+            while True:
+                try:
+                    # Poll so Ctrl+C is seen on platforms where a blocking get() ignores it.
+                    chunk = chunks.get(timeout=QUEUE_POLL_INTERVAL)
+                except queue.Empty:
+                    if pending:
+                        out.write(pending)
+                        out.flush()
+                        pending.clear()
+                    continue
+
+                error = None
+                while True:
+                    if isinstance(chunk, BaseException):
+                        error = chunk
+                        break
+                    pending += chunk
+                    try:
+                        chunk = chunks.get_nowait()
+                    except queue.Empty:
+                        break
+
+                if error:
+                    if pending and not pending.endswith(b"\n"):
+                        pending += b"\n"
+                    raise error
+                # Pass complete lines through untouched, in one write.
+                end = pending.rfind(b"\n") + 1
+                if end:
+                    out.write(pending[:end])
+                    out.flush()
+                    del pending[:end]
+        finally:
+            if pending:
+                out.write(pending)
+                out.flush()
+
+    def _start_application(self, ser: serial.Serial) -> None:
         """Ensure app starts if board is at REPL."""
+        import serial
+
         try:
             ser.reset_input_buffer()
             ser.write(b"\x03")
@@ -2,9 +2,14 @@
 
 from __future__ import annotations
 
+import contextlib
+import importlib
 import subprocess
+import sys
+import threading
 import time
-from functools import wraps
+from collections import deque
+from functools import lru_cache, wraps
 from typing import TYPE_CHECKING, Any, TypeVar
 
 from .config import RetryConfig
@@ -17,13 +22,16 @@ if TYPE_CHECKING:
 
 T = TypeVar("T")
 
+STDERR_TAIL_LINES = 50
+
 
 def retry(
     max_attempts: int = RetryConfig.MAX_RETRIES,
     delay: float = RetryConfig.RETRY_DELAY,
     exceptions: tuple[type[Exception], ...] = (subprocess.CalledProcessError,),
+    backoff: float = RetryConfig.RETRY_BACKOFF,
 ) -> Callable[[Callable[..., T]], Callable[..., T]]:
-    """Decorator to retry a function on failure."""
+    """Decorator to retry a function on failure, multiplying the delay by `backoff` each time."""
 
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
         @wraps(func)
@@ -38,10 +46,11 @@ def retry(
                 except exceptions as e:
                     last_exception = e
                     if attempt < max_attempts:
+                        wait = delay * backoff ** (attempt - 1)
                         print_warning(
-                            f"Attempt {attempt}/{max_attempts} failed, retrying in {delay}s...",
+                            f"Attempt {attempt}/{max_attempts} failed, retrying in {wait:g}s...",
                         )
-                        time.sleep(delay)
+                        time.sleep(wait)
                     else:
                         print_error(f"All {max_attempts} attempts failed")
 
@@ -55,6 +64,34 @@ def retry(
     return decorator
 
 
+def _run_discarding_stdout(
+    cmd: list[str],
+    cwd: str | None,
+    env: dict[str, str] | None,
+    timeout: int | None,
+) -> subprocess.CompletedProcess[bytes]:
+    """Run a command with stdout discarded, keeping only the tail of stderr."""
+    tail: deque[bytes] = deque(maxlen=STDERR_TAIL_LINES)
+    with subprocess.Popen(
+        cmd,
+        cwd=cwd,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    ) as proc:
+        reader = threading.Thread(target=tail.extend, args=(proc.stderr,), daemon=True)
+        reader.start()
+        try:
+            returncode = proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            raise
+        finally:
+            reader.join(timeout=1)
+
+    return subprocess.CompletedProcess(cmd, returncode, None, b"".join(tail))
+
+
 def run_command(  # noqa: PLR0913
     cmd: list[str],
     cwd: str | Path | None = None,
@@ -63,23 +100,32 @@ def run_command(  # noqa: PLR0913
     check: bool = True,
     capture_output: bool = False,
     verbose: bool = False,
+    quiet: bool = False,
 ) -> subprocess.CompletedProcess[bytes]:
-    """Run a command with consistent error handling."""
+    """Run a command with consistent error handling.
+
+    Output goes to the terminal unless `capture_output` is set. With `quiet`,
+    stdout is discarded and only the last `STDERR_TAIL_LINES` of stderr are
+    kept for error reporting.
+    """
     if verbose:
         print_command(cmd)
 
     try:
-        result = subprocess.run(
-            cmd,
-            cwd=str(cwd) if cwd else None,
-            env=env,
-            timeout=timeout,
-            check=False,
-            capture_output=capture_output,
-        )
+        if quiet and not capture_output:
+            result = _run_discarding_stdout(cmd, str(cwd) if cwd else None, env, timeout)
+        else:
+            result = subprocess.run(
+                cmd,
+                cwd=str(cwd) if cwd else None,
+                env=env,
+                timeout=timeout,
+                check=False,
+                capture_output=capture_output,
+            )
 
         if check and result.returncode != 0:
-            stderr = result.stderr.decode("utf-8", errors="ignore") if capture_output else None
+            stderr = result.stderr.decode("utf-8", errors="ignore") if result.stderr else None
             raise CommandError(cmd, result.returncode, stderr)
 
     except subprocess.TimeoutExpired as e:
@@ -109,12 +155,13 @@ def run_command_quiet(
         return False, ""
 
 
+@lru_cache(maxsize=None)
 def check_command_available(
     command: str,
     version_flag: str = "--version",
     timeout: int = 5,
 ) -> bool:
-    """Return whether a command-line tool is available."""
+    """Return whether a command-line tool is available; cached for the process."""
     success, _ = run_command_quiet([command, version_flag], timeout=timeout)
     return success
 
@@ -134,6 +181,33 @@ def run_interactive(
         return result.returncode
 
 
+def run_esptool(args: list[str]) -> None:
+    """Run esptool in this interpreter, falling back to `python -m esptool`.
+
+    Running in-process skips a fresh interpreter start and esptool import per
+    call. esptool keeps module-level logging state, so calls from worker
+    threads (parallel flashing) get their own process. Failures are raised as
+    `CommandError` either way.
+    """
+    esptool = None
+    if threading.current_thread() is threading.main_thread():
+        with contextlib.suppress(ImportError):
+            esptool = importlib.import_module("esptool")
+    if esptool is None:
+        run_command([sys.executable, "-m", "esptool", *args], verbose=True)
+        return
+
+    cmd = ["esptool", *args]
+    print_command(cmd)
+    try:
+        esptool.main(args)
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            raise CommandError(cmd, e.code if isinstance(e.code, int) else 1) from e
+    except esptool.FatalError as e:
+        raise CommandError(cmd, 2, str(e)) from e
+
+
 def get_command_output(
     cmd: list[str],
     cwd: str | Path | None = None,
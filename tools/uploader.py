@@ -2,26 +2,32 @@
 
 from __future__ import annotations
 
-import sys
+import contextlib
+import json
+import os
 from typing import TYPE_CHECKING
 
 from .config import FlashConfig, FlashingConfig, ProjectPaths, UploadConfig
 from .console import (
     StatusLogger,
-    print_file_operation,
+    print_file_operations,
     print_header,
     print_info,
     print_success,
     print_warning,
-    progress_bar,
 )
 from .device import ESP32Device, check_mpremote, get_or_find_port
 from .exceptions import CommandError, FlashError, OperationTimeoutError, UploadError
-from .subprocess_utils import retry, run_command
+from .fs_utils import file_sha256
+from .subprocess_utils import retry, run_esptool
 
 if TYPE_CHECKING:
     from pathlib import Path
 
+UPLOAD_TIMEOUT_PER_FILE = 30
+STALE_MARKER = "STALE "
+UPLOAD_CACHE_FILE = ".upload-cache.json"
+
 
 class FirmwareUploader:
     """Uploads firmware to ESP32 devices."""
@@ -33,12 +39,15 @@ class FirmwareUploader:
 
     def check_firmware_files(self) -> None:
         """Verify required firmware files exist in `dist/`."""
-        if not self.paths.dist.exists():
+        try:
+            with os.scandir(self.paths.dist) as entries:
+                present = {entry.name for entry in entries}
+        except FileNotFoundError:
             msg = f"Dist directory not found: {self.paths.dist}\nRun 'build' command first"
-            raise FlashError(msg)
+            raise FlashError(msg) from None
 
-        required_files = ["bootloader.bin", "partition-table.bin", "firmware.bin"]
-        missing = [f for f in required_files if not (self.paths.dist / f).exists()]
+        required_files = [name for _, name in FlashConfig.flash_layout(self.config.chip_type)]
+        missing = [f for f in required_files if f not in present]
 
         if missing:
             msg = f"Missing firmware files: {', '.join(missing)}\nPlease rebuild firmware"
@@ -46,25 +55,10 @@ class FirmwareUploader:
 
         print_success("All firmware files found")
 
-    def erase_flash(self, port: str) -> None:
-        """Erase device flash memory."""
-        with StatusLogger("Erasing flash memory"):
-            try:
-                run_command(
-                    [sys.executable, "-m", "esptool", "--port", port, "erase-flash"],
-                    verbose=True,
-                )
-            except (CommandError, OperationTimeoutError, OSError) as e:
-                msg = f"Failed to erase flash: {e}"
-                raise FlashError(msg) from e
-
-    def upload_firmware(self, port: str) -> None:
-        """Flash bootloader, partition table, and firmware."""
+    def upload_firmware(self, port: str, *, erase: bool = False) -> None:
+        """Flash bootloader, partition table, and firmware; `erase` wipes flash first."""
         with StatusLogger(f"Uploading firmware to {port} at {self.config.baud} baud"):
-            cmd = [
-                sys.executable,
-                "-m",
-                "esptool",
+            args = [
                 "--chip",
                 self.config.chip_type.value,
                 "--port",
@@ -72,17 +66,14 @@ class FirmwareUploader:
                 "--baud",
                 str(self.config.baud),
                 "write-flash",
+                *(["--erase-all"] if erase else []),
                 "-z",
-                hex(FlashConfig.get_bootloader_addr(self.config.chip_type)),
-                str(self.paths.dist / "bootloader.bin"),
-                hex(FlashConfig.PARTITION_TABLE_ADDR),
-                str(self.paths.dist / "partition-table.bin"),
-                hex(FlashConfig.FIRMWARE_ADDR),
-                str(self.paths.dist / "firmware.bin"),
             ]
+            for address, name in FlashConfig.flash_layout(self.config.chip_type):
+                args += [address, str(self.paths.dist / name)]
 
             try:
-                run_command(cmd, verbose=True)
+                run_esptool(args)
             except (CommandError, OperationTimeoutError, OSError) as e:
                 msg = f"Failed to upload firmware: {e}"
                 raise FlashError(msg) from e
@@ -95,9 +86,9 @@ class FirmwareUploader:
         port = get_or_find_port(self.config.port)
 
         if self.config.erase:
-            self.erase_flash(port)
+            print_info("Erasing flash as part of the write")
 
-        self.upload_firmware(port)
+        self.upload_firmware(port, erase=self.config.erase)
         print_success("Firmware upload completed")
 
 
@@ -108,29 +99,110 @@ class FileUploader:
         """Initialize file uploader."""
         self.config = config
         self.paths = paths
+        self._files: list[tuple[Path, str]] | None = None
+
+    def _sync_script(self, manifest: dict[str, str | None]) -> str:
+        """MicroPython snippet that removes outdated files and prints those to upload.
+
+        `manifest` maps remote paths to the expected sha256, or None for files
+        that should just be removed.
+        """
+        return f"""import os, hashlib, binascii
+def digest(path):
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return None
+    h = hashlib.sha256()
+    while True:
+        chunk = f.read(1024)
+        if not chunk:
+            break
+        h.update(chunk)
+    f.close()
+    return binascii.hexlify(h.digest()).decode()
+for path, expected in {manifest!r}.items():
+    if expected is None or digest(path) != expected:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        if expected:
+            print("{STALE_MARKER}" + path)
+"""
+
+    def stale_files(
+        self,
+        device: ESP32Device,
+        files: list[tuple[Path, str]],
+    ) -> list[tuple[Path, str]]:
+        """Remove outdated files on the device and return the pairs that need uploading.
+
+        Hashes are compared on the device in one mpremote call. If the device
+        cannot be probed, every file is returned.
+        """
+        manifest: dict[str, str | None] = dict.fromkeys(
+            [f"/{filename}" for filename in self.config.files] + ["/config.json"],
+        )
+        digests = self.local_digests(files)
+        for local_path, remote_path in files:
+            manifest[remote_path] = digests[os.fspath(local_path)]
+
+        output = device.exec_output(self._sync_script(manifest))
+        if output is None:
+            print_warning("Could not compare files on the device, uploading all of them")
+            return files
+
+        stale = {
+            line.removeprefix(STALE_MARKER)
+            for line in output.splitlines()
+            if line.startswith(STALE_MARKER)
+        }
+        return [(local_path, remote) for local_path, remote in files if remote in stale]
+
+    def local_digests(self, files: list[tuple[Path, str]]) -> dict[str, str]:
+        """Return the sha256 of each local file, keyed by path.
+
+        Digests are kept in `dist/.upload-cache.json` and reused while a file's
+        size and mtime are unchanged.
+        """
+        cache_file = self.paths.dist / UPLOAD_CACHE_FILE
+        try:
+            cached = json.loads(cache_file.read_text())
+        except (OSError, ValueError):
+            cached = {}
+        if not isinstance(cached, dict):
+            cached = {}
+
+        digests: dict[str, str] = {}
+        entries: dict[str, list[int | str]] = {}
+        for local_path, _ in files:
+            path = os.fspath(local_path)
+            st = os.stat(path)
+            try:
+                size, mtime_ns, digest = cached.get(path)
+            except (TypeError, ValueError):
+                size = mtime_ns = digest = None
+            if (size, mtime_ns) == (st.st_size, st.st_mtime_ns) and isinstance(digest, str):
+                digests[path] = digest
+            else:
+                digests[path] = file_sha256(path)
+            entries[path] = [st.st_size, st.st_mtime_ns, digests[path]]
+
+        if entries != cached:
+            with contextlib.suppress(OSError):
+                cache_file.parent.mkdir(parents=True, exist_ok=True)
+                cache_file.write_text(json.dumps(entries))
+        return digests
 
     @retry(exceptions=(UploadError,))
-    def upload_file(self, device: ESP32Device, local_path: Path, remote_path: str) -> None:
-        """Upload one file, with retry."""
-        if not device.copy_file(str(local_path), remote_path, timeout=30):
-            msg = f"Failed to upload {local_path.name}"
+    def upload_batch(self, device: ESP32Device, files: list[tuple[Path, str]]) -> None:
+        """Upload `files` in one mpremote session, with retry."""
+        commands = [["fs", "cp", str(local_path), f":{remote}"] for local_path, remote in files]
+        if not device.run_batch(commands, timeout=UPLOAD_TIMEOUT_PER_FILE * len(files)):
+            msg = f"Failed to upload {len(files)} file(s) to {device.port}"
             raise UploadError(msg)
 
-        print_file_operation("Uploaded", f"{local_path.name} → {remote_path}")
-
-    def prepare_device(self, device: ESP32Device) -> None:
-        """Interrupt app and remove old files."""
-        print_info("Interrupting any running application...")
-        if not device.interrupt_program():
-            print_warning("Could not interrupt running program, continuing")
-
-        print_info("Clearing old application files...")
-
-        old_files = [f"/{filename}" for filename in self.config.files] + ["/config.json"]
-
-        for file_path in old_files:
-            device.remove_file(file_path)
-
     def collect_files(self) -> list[tuple[Path, str]]:
         """Collect `(local_path, remote_path)` upload pairs."""
         if not self.paths.src.exists():
@@ -163,24 +235,32 @@ class FileUploader:
 
         return files_to_upload
 
-    def upload_files(self) -> None:
-        """Upload application files and restart device."""
+    def prepare(self) -> list[tuple[Path, str]]:
+        """Collect upload pairs and hash them once; safe to run before the device is ready."""
+        if self._files is None:
+            self._files = self.collect_files()
+            self.local_digests(self._files)
+        return self._files
+
+    def upload_files(self, port: str | None = None) -> None:
+        """Upload application files and restart device; `port` overrides the configured one."""
         print_header("StripAlerts Application File Uploader")
 
         check_mpremote()
-        port = get_or_find_port(self.config.port)
+        port = get_or_find_port(port or self.config.port)
         device = ESP32Device(port)
 
-        self.prepare_device(device)
-        files = self.collect_files()
-
-        print_info(f"Preparing to upload {len(files)} file(s)...")
+        files = self.stale_files(device, self.prepare())
 
-        with progress_bar() as progress:
-            task = progress.add_task("Uploading...", total=len(files))
-            for local_path, remote_path in files:
-                self.upload_file(device, local_path, remote_path)
-                progress.advance(task)
+        if files:
+            with StatusLogger(f"Uploading {len(files)} file(s)"):
+                self.upload_batch(device, files)
+                print_file_operations(
+                    "Uploaded",
+                    [f"{local_path.name} → {remote_path}" for local_path, remote_path in files],
+                )
+        else:
+            print_info("Files on the device are up to date, skipping upload")
 
         print_info("Restarting device to run uploaded code...")
         if device.soft_reset():